@@ -0,0 +1,156 @@
+"""
+Cold storage for old audit entries.
+
+Rows older than the retention window are moved, a whole month at a time, into
+gzip-compressed JSON Lines files (AUDIT_ARCHIVE_DIR/audit-YYYY-MM.jsonl.gz) and
+deleted from the hot table. The audit browser can still search an archived
+month; it just reads the file on demand.
+"""
+import datetime
+import gzip
+import json
+import os
+import re
+from pathlib import Path
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import AuditLog
+
+ARCHIVE_FILE = re.compile(r'^audit-(\d{4})-(\d{2})\.jsonl\.gz$')
+FIELDS = ['id', 'timestamp', 'actor_id', 'actor__username', 'action', 'target_model',
+          'target_object_id', 'target_repr', 'details', 'ip_address']
+
+
+def archive_dir():
+    return Path(settings.AUDIT_ARCHIVE_DIR)
+
+
+def archive_path(year, month):
+    return archive_dir() / f"audit-{year:04d}-{month:02d}.jsonl.gz"
+
+
+def archived_months():
+    """Returns the (year, month) pairs that have an archive file, newest first."""
+    if not archive_dir().is_dir():
+        return []
+    months = []
+    for name in os.listdir(archive_dir()):
+        match = ARCHIVE_FILE.match(name)
+        if match:
+            months.append((int(match.group(1)), int(match.group(2))))
+    return sorted(months, reverse=True)
+
+
+def month_start(year, month):
+    """Aware datetime for local midnight on the first of the month."""
+    return timezone.make_aware(datetime.datetime(year, month, 1))
+
+
+def next_month(year, month):
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def retention_cutoff(days):
+    """
+    Start of the month containing (today - days). Everything before it is
+    archived, so only complete months ever leave the hot table.
+    """
+    oldest_kept = timezone.localdate() - datetime.timedelta(days=days)
+    return month_start(oldest_kept.year, oldest_kept.month)
+
+
+def months_before(cutoff):
+    """The (year, month) pairs that still have hot rows older than cutoff, oldest first."""
+    oldest = AuditLog.objects.filter(timestamp__lt=cutoff).order_by('timestamp', 'id').first()
+    if oldest is None:
+        return []
+    local = timezone.localtime(oldest.timestamp)
+    months = []
+    year, month = local.year, local.month
+    while month_start(year, month) < cutoff:
+        months.append((year, month))
+        year, month = next_month(year, month)
+    return months
+
+
+def read_archive(year, month):
+    """Yields the archived entries of a month as dicts, in file order."""
+    path = archive_path(year, month)
+    if not path.exists():
+        return
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def archive_month(year, month, chunk_size=5000):
+    """
+    Moves one month of hot rows into its archive file, chunk by chunk.
+    Each chunk is appended (as its own gzip member) and flushed to disk before
+    the same rows are deleted, so an interrupted run loses nothing; rows that
+    were written but not yet deleted are skipped, not duplicated, on the next run.
+    Returns the number of rows moved.
+    """
+    start = month_start(year, month)
+    end = month_start(*next_month(year, month))
+    path = archive_path(year, month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    already_archived = {entry['id'] for entry in read_archive(year, month)}
+
+    moved = 0
+    while True:
+        rows = list(AuditLog.objects.filter(timestamp__gte=start, timestamp__lt=end)
+                    .order_by('timestamp', 'id').values(*FIELDS)[:chunk_size])
+        if not rows:
+            return moved
+
+        new_rows = [row for row in rows if row['id'] not in already_archived]
+        if new_rows:
+            with gzip.open(path, 'at', encoding='utf-8') as f:
+                for row in new_rows:
+                    row['actor_username'] = row.pop('actor__username')
+                    row['timestamp'] = row['timestamp'].isoformat()
+                    f.write(json.dumps(row) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+        with transaction.atomic():
+            AuditLog.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        moved += len(rows)
+
+
+def search_archive(year, month, action=None, actor_id=None, target_model=None,
+                   target_object_id=None, start=None, end=None):
+    """
+    Reads an archived month and returns the matching entries as unsaved
+    AuditLog instances (with their actor attached when it still exists),
+    newest first, like the hot table.
+    """
+    from apps.users.models import User
+
+    matches = []
+    for entry in read_archive(year, month):
+        if action and entry['action'] != action:
+            continue
+        if actor_id and entry['actor_id'] != actor_id:
+            continue
+        if target_model and entry['target_model'] != target_model:
+            continue
+        if target_object_id and entry['target_object_id'] != target_object_id:
+            continue
+        timestamp = datetime.datetime.fromisoformat(entry['timestamp'])
+        if (start and timestamp < start) or (end and timestamp >= end):
+            continue
+        entry.pop('actor_username', None)
+        entry['timestamp'] = timestamp
+        matches.append(AuditLog(**entry))
+
+    actors = User.objects.in_bulk({log.actor_id for log in matches if log.actor_id})
+    for log in matches:
+        if log.actor_id:
+            log.actor = actors.get(log.actor_id)
+
+    matches.sort(key=lambda log: (log.timestamp, log.id), reverse=True)
+    return matches
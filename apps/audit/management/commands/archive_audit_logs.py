@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from apps.audit.archive import (
+    archive_month, archive_path, month_start, months_before, next_month, retention_cutoff
+)
+from apps.audit.models import AuditLog
+
+
+class Command(BaseCommand):
+    help = "Moves audit log entries older than the retention window into monthly gzip archives."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help="Retention window in days (default: settings.AUDIT_RETENTION_DAYS)")
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help="Rows written and deleted per step")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report what would be archived")
+        parser.add_argument('--vacuum', action='store_true',
+                            help="Run VACUUM afterwards so SQLite returns the freed space to disk")
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.AUDIT_RETENTION_DAYS
+        if days < 0:
+            raise CommandError("--days must not be negative")
+
+        cutoff = retention_cutoff(days)
+        months = months_before(cutoff)
+        if not months:
+            self.stdout.write(f"Nothing to archive before {cutoff:%Y-%m-%d}.")
+            return
+
+        total = 0
+        for year, month in months:
+            if options['dry_run']:
+                count = AuditLog.objects.filter(
+                    timestamp__gte=month_start(year, month),
+                    timestamp__lt=month_start(*next_month(year, month)),
+                ).count()
+                self.stdout.write(f"{year:04d}-{month:02d}: {count} row(s) would be archived")
+                total += count
+                continue
+
+            moved = archive_month(year, month, chunk_size=options['chunk_size'])
+            total += moved
+            if moved:
+                self.stdout.write(f"{year:04d}-{month:02d}: {moved} row(s) -> {archive_path(year, month)}")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"Dry run: {total} row(s) older than {cutoff:%Y-%m-%d}."))
+            return
+
+        if options['vacuum'] and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute("VACUUM")
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} audit log row(s) older than {cutoff:%Y-%m-%d}."))
@@ -0,0 +1,17 @@
+from .utils import request_buffer
+
+
+class AuditBufferMiddleware:
+    """
+    Collects the audit entries logged while handling a request and writes them
+    with a single bulk_create once the response is ready (AUDIT_LOG_MODE = 'request').
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_buffer.start()
+        try:
+            return self.get_response(request)
+        finally:
+            request_buffer.flush()
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:35
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0002_audit_keyset_indexes'),
+    ]
+
+    operations = [
+        # auto_now_add -> default=timezone.now is a Python-side change only (the
+        # column is identical), so don't let SQLite rebuild the audit table for it
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='auditlog',
+                    name='timestamp',
+                    field=models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class AuditLog(models.Model):
     class Action(models.TextChoices):
@@ -21,10 +22,20 @@ class AuditLog(models.Model):
     
     details = models.TextField(null=True, blank=True, help_text="Additional context")
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the action is logged: buffered entries are inserted later (see utils)
+    timestamp = models.DateTimeField(default=timezone.now)
 
     class Meta:
-        ordering = ['-timestamp']
+        # (timestamp, id) is the keyset used to page through the log; every
+        # filter the audit browser offers gets an index ending in that keyset
+        # so a filtered page is an index range scan, however large the table.
+        ordering = ['-timestamp', '-id']
+        indexes = [
+            models.Index(fields=['timestamp', 'id'], name='audit_ts_id_idx'),
+            models.Index(fields=['action', 'timestamp', 'id'], name='audit_action_ts_idx'),
+            models.Index(fields=['actor', 'timestamp', 'id'], name='audit_actor_ts_idx'),
+            models.Index(fields=['target_model', 'target_object_id', 'timestamp', 'id'], name='audit_target_ts_idx'),
+        ]
 
     def __str__(self):
         return f"{self.timestamp} - {self.actor} {self.action} {self.target_model}"
@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('logs/', views.audit_view, name='audit_list'),
+    path('logs/actors/', views.actor_autocomplete, name='audit_actor_autocomplete'),
 ]
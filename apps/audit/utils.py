@@ -1,5 +1,13 @@
+import atexit
+import logging
+import threading
+from django.conf import settings
+from django.db import connection, IntegrityError
+from django.utils import timezone
 from .models import AuditLog
 
+logger = logging.getLogger(__name__)
+
 def get_client_ip(request):
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
     if x_forwarded_for:
@@ -12,19 +20,153 @@ def log_action(request, obj, action, details=None):
     """
     Log a user action.
     :param request: The HTTP request object (to get user and IP)
-    :param obj: The object being acted upon (Student, Transaction, etc.)
+    :param obj: The object being acted upon (Student, Transaction, etc.),
+                or a model class for bulk actions (e.g. Student for an import)
     :param action: AuditLog.Action constant
     :param details: Optional Text/JSON details
+
+    The entry is captured and timestamped now (so deleting obj afterwards is fine) but written
+    according to settings.AUDIT_LOG_MODE:
+    - 'sync': inserted immediately (use in tests)
+    - 'request': collected for the current request and inserted with one
+      bulk_create when it finishes (needs AuditBufferMiddleware; outside a
+      request it falls back to 'sync')
+    - 'queue': handed to a process-wide queue flushed by a background thread
+      every AUDIT_FLUSH_INTERVAL seconds, at AUDIT_BATCH_SIZE entries, and on exit
     """
     if not request.user.is_authenticated:
         return # Don't log anonymous actions for now, or handle differently
 
-    AuditLog.objects.create(
+    if isinstance(obj, type):
+        target_model, target_object_id, target_repr = obj.__name__, None, obj._meta.verbose_name_plural
+    else:
+        target_model, target_object_id, target_repr = obj.__class__.__name__, str(obj.pk) if obj.pk else None, str(obj)
+
+    entry = AuditLog(
         actor=request.user,
         action=action,
-        target_model=obj.__class__.__name__,
-        target_object_id=str(obj.pk) if obj.pk else None,
-        target_repr=str(obj)[:255],
+        target_model=target_model,
+        target_object_id=target_object_id,
+        target_repr=str(target_repr)[:255],
         details=details,
-        ip_address=get_client_ip(request)
+        ip_address=get_client_ip(request),
+        timestamp=timezone.now(),
     )
+
+    mode = getattr(settings, 'AUDIT_LOG_MODE', 'sync')
+    if mode == 'queue':
+        audit_queue.add(entry)
+    elif mode == 'request' and request_buffer.is_active():
+        request_buffer.add(entry)
+    else:
+        entry.save()
+
+def write_entries(entries):
+    """
+    Inserts buffered entries with one bulk_create.
+    If that fails (e.g. an actor was deleted before the flush), entries are
+    inserted one by one and any that still fail are kept without their actor,
+    so nothing is lost.
+    """
+    if not entries:
+        return
+    try:
+        AuditLog.objects.bulk_create(entries)
+        return
+    except IntegrityError:
+        logger.warning("Audit bulk insert failed, retrying entries one by one")
+
+    for entry in entries:
+        entry.pk = None
+        try:
+            entry.save()
+        except IntegrityError:
+            entry.pk = None
+            entry.actor = None
+            entry.save()
+
+
+class RequestAuditBuffer(threading.local):
+    """
+    Collects the audit entries of the request being handled on this thread.
+    Activated and flushed by AuditBufferMiddleware.
+    """
+    def __init__(self):
+        self.entries = None
+
+    def is_active(self):
+        return self.entries is not None
+
+    def start(self):
+        self.entries = []
+
+    def add(self, entry):
+        self.entries.append(entry)
+
+    def flush(self):
+        """
+        Writes the request's entries. The request has done its work by now, so
+        a failure (e.g. database locked) must not turn it into an error: the
+        entries are handed to the background queue to be retried instead.
+        """
+        entries, self.entries = self.entries, None
+        try:
+            write_entries(entries)
+        except Exception:
+            logger.exception("Failed to write %d audit entries, queueing them for retry", len(entries))
+            for entry in entries:
+                entry.pk = None
+                audit_queue.add(entry)
+
+
+class AuditQueue:
+    """
+    Process-wide write-behind queue. A daemon thread flushes it periodically;
+    an atexit hook flushes whatever is left on a clean shutdown.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = []
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+            size = len(self._entries)
+            if self._thread is None:
+                self._start()
+        if size >= getattr(settings, 'AUDIT_BATCH_SIZE', 100):
+            self._wakeup.set()
+
+    def flush(self):
+        with self._lock:
+            entries, self._entries = self._entries, []
+        try:
+            write_entries(entries)
+        except Exception:
+            # e.g. database locked: put them back for the next flush
+            with self._lock:
+                self._entries[:0] = entries
+            raise
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='audit-flush', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        interval = getattr(settings, 'AUDIT_FLUSH_INTERVAL', 2)
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush audit log queue")
+            finally:
+                connection.close()
+
+
+request_buffer = RequestAuditBuffer()
+audit_queue = AuditQueue()
@@ -1,33 +1,188 @@
+import datetime
 from django.shortcuts import render
 from django.contrib.auth.decorators import user_passes_test
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils import timezone
 from .models import AuditLog
+from .archive import archived_months, search_archive
 from apps.users.models import User
 
+PAGE_SIZE = 50
+ACTOR_SUGGESTIONS = 10
+
 def is_admin(user):
     return user.is_authenticated and user.role == User.Role.ADMIN
 
+def parse_date_param(value):
+    """
+    Parses a YYYY-MM-DD query parameter. Returns None if missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+def start_of_day(date):
+    """Aware datetime for local midnight at the start of date."""
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+def parse_month_param(value):
+    """
+    Parses a YYYY-MM query parameter. Returns (year, month) or None.
+    """
+    try:
+        date = datetime.datetime.strptime(value or '', '%Y-%m')
+    except ValueError:
+        return None
+    return date.year, date.month
+
+def page_archived(entries, after, before):
+    """
+    Same keyset paging as the live log, over archived entries (newest first).
+    Returns (page, has_older, has_newer).
+    """
+    if before:
+        newer = [log for log in entries if (log.timestamp, log.id) > before]
+        return newer[-PAGE_SIZE:], True, len(newer) > PAGE_SIZE
+    if after:
+        entries = [log for log in entries if (log.timestamp, log.id) < after]
+    return entries[:PAGE_SIZE], len(entries) > PAGE_SIZE, after is not None
+
+def encode_cursor(log):
+    return f"{log.timestamp.isoformat()}_{log.id}"
+
+def decode_cursor(value):
+    """
+    Turns a cursor back into its (timestamp, id) keyset. Returns None if invalid.
+    """
+    if not value:
+        return None
+    timestamp, _, log_id = value.rpartition('_')
+    try:
+        return datetime.datetime.fromisoformat(timestamp), int(log_id)
+    except ValueError:
+        return None
+
 @user_passes_test(is_admin)
 def audit_view(request):
     """
     Read-only view of the audit logs.
+    Paged with a (timestamp, id) cursor rather than OFFSET, so any page costs
+    the same index range scan: ?after=<cursor> for older rows, ?before=<cursor>
+    for newer ones. ?archive=YYYY-MM searches an archived month instead.
     """
-    logs = AuditLog.objects.select_related('actor').all()
-    
-    # Simple Filters
+    # 1. Filters (each one backed by an index ending in timestamp, id)
     action = request.GET.get('action')
     actor_id = request.GET.get('actor')
-    
-    if action:
-        logs = logs.filter(action=action)
-    if actor_id and actor_id.isdigit():
-        logs = logs.filter(actor_id=int(actor_id))
-        
+    actor_id = int(actor_id) if actor_id and actor_id.isdigit() else None
+    target_model = request.GET.get('target_model', '').strip()
+    target_object_id = request.GET.get('target_id', '').strip() if target_model else ''
+    start_date = parse_date_param(request.GET.get('from'))
+    end_date = parse_date_param(request.GET.get('to'))
+    start = start_of_day(start_date) if start_date else None
+    end = start_of_day(end_date + datetime.timedelta(days=1)) if end_date else None
+    archive_month = parse_month_param(request.GET.get('archive'))
+
+    after = decode_cursor(request.GET.get('after'))
+    before = decode_cursor(request.GET.get('before'))
+
+    if archive_month:
+        # 2a. An archived month: read its file on demand and filter in memory
+        entries = search_archive(
+            *archive_month, action=action, actor_id=actor_id, target_model=target_model,
+            target_object_id=target_object_id, start=start, end=end
+        )
+        page, has_older, has_newer = page_archived(entries, after, before)
+    else:
+        logs = AuditLog.objects.select_related('actor')
+        if action:
+            logs = logs.filter(action=action)
+        if actor_id:
+            logs = logs.filter(actor_id=actor_id)
+        if target_model:
+            logs = logs.filter(target_model=target_model)
+            if target_object_id:
+                logs = logs.filter(target_object_id=target_object_id)
+        if start:
+            logs = logs.filter(timestamp__gte=start)
+        if end:
+            logs = logs.filter(timestamp__lt=end)
+
+        # 2b. Keyset pagination (one extra row tells us whether there is another page)
+        if before:
+            timestamp, log_id = before
+            page = list(logs.filter(
+                Q(timestamp__gt=timestamp) | Q(id__gt=log_id), timestamp__gte=timestamp
+            ).order_by('timestamp', 'id')[:PAGE_SIZE + 1])
+            has_newer = len(page) > PAGE_SIZE
+            page = page[:PAGE_SIZE][::-1]
+            has_older = True
+        else:
+            if after:
+                timestamp, log_id = after
+                # The plain timestamp bound lets the index seek; the OR breaks ties on id
+                logs = logs.filter(Q(timestamp__lt=timestamp) | Q(id__lt=log_id), timestamp__lte=timestamp)
+            page = list(logs.order_by('-timestamp', '-id')[:PAGE_SIZE + 1])
+            has_older = len(page) > PAGE_SIZE
+            page = page[:PAGE_SIZE]
+            has_newer = after is not None
+
+    # Links keep the current filters and swap the cursor
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    newer_url = older_url = None
+    if page and has_newer:
+        params['before'] = encode_cursor(page[0])
+        newer_url = '?' + params.urlencode()
+        del params['before']
+    if page and has_older:
+        params['after'] = encode_cursor(page[-1])
+        older_url = '?' + params.urlencode()
+        del params['after']
+
+    selected_actor = User.objects.filter(id=actor_id).first() if actor_id else None
+
     context = {
-        'logs': logs[:100], # Limit to last 100 for performance for now
+        'logs': page,
         'actions': AuditLog.Action.choices,
-        'users': User.objects.filter(is_active=True).order_by('username'),
         'selected_action': action,
-        'selected_actor': int(actor_id) if actor_id and actor_id.isdigit() else None
+        'selected_actor': selected_actor,
+        'target_model': target_model,
+        'target_id': target_object_id,
+        'start_date': start_date,
+        'end_date': end_date,
+        'archived_months': [datetime.date(year, month, 1) for year, month in archived_months()],
+        'selected_archive': datetime.date(*archive_month, 1) if archive_month else None,
+        'newer_url': newer_url,
+        'older_url': older_url,
+        'first_page_url': '?' + params.urlencode() if has_newer else None,
     }
-    
+
     return render(request, 'audit/audit_list.html', context)
+
+@user_passes_test(is_admin)
+def actor_autocomplete(request):
+    """
+    JSON suggestions for the actor filter, matched on username or name prefix.
+    """
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'results': []})
+
+    users = User.objects.filter(
+        Q(username__istartswith=query) |
+        Q(first_name__istartswith=query) |
+        Q(last_name__istartswith=query)
+    ).order_by('username').values('id', 'username', 'first_name', 'last_name', 'role')[:ACTOR_SUGGESTIONS]
+
+    results = [{
+        'id': u['id'],
+        'username': u['username'],
+        'name': f"{u['first_name']} {u['last_name']}".strip(),
+        'role': u['role'],
+    } for u in users]
+    return JsonResponse({'results': results})
@@ -1,3 +1,15 @@
 from django.contrib import admin
+from .models import StudentClass
 
-# Register your models here.
+
+@admin.register(StudentClass)
+class StudentClassAdmin(admin.ModelAdmin):
+    list_display = ('name',)
+    actions = ['create_portal_accounts']
+
+    @admin.action(description="Create portal accounts for students in selected classes")
+    def create_portal_accounts(self, request, queryset):
+        from apps.students.models import Student
+        from apps.students.accounts import provision_accounts
+        from apps.students.admin import report_provisioned
+        report_provisioned(self, request, provision_accounts(Student.objects.filter(current_class__in=queryset)))
@@ -12,3 +12,7 @@ class CoreConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
+
+    def ready(self):
+        # Register signal handlers (home dashboard cache invalidation)
+        from . import signals  # noqa: F401
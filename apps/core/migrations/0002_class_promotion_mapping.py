@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentclass',
+            name='graduates',
+            field=models.BooleanField(default=False, help_text='Students in this class graduate at year end'),
+        ),
+        migrations.AddField(
+            model_name='studentclass',
+            name='next_class',
+            field=models.ForeignKey(blank=True, help_text='Class its students move to at year end', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='previous_classes', to='core.studentclass'),
+        ),
+    ]
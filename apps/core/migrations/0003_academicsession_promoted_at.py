@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_class_promotion_mapping'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='academicsession',
+            name='promoted_at',
+            field=models.DateTimeField(blank=True, help_text="When this session's students were promoted", null=True),
+        ),
+    ]
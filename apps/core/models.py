@@ -6,6 +6,8 @@ class AcademicSession(models.Model):
     """
     name = models.CharField(max_length=20, unique=True, help_text="e.g. 2024/2025")
     is_current = models.BooleanField(default=False, help_text="Set to True if this is the current active session")
+    # Year-end promotion runs once per session (see apps.students.promotion)
+    promoted_at = models.DateTimeField(null=True, blank=True, help_text="When this session's students were promoted")
 
     def save(self, *args, **kwargs):
         # Ensure only one session is marked as current at a time
@@ -36,11 +38,31 @@ class Term(models.Model):
     def __str__(self):
         return f"{self.name} ({self.session.name})"
 
+    @property
+    def sort_key(self):
+        """
+        Terms are ordered by session name, then term name. This assumes names
+        that sort in calendar order, e.g. "2024/2025" and "Term 1" to "Term 3"
+        ("Term 10" would sort before "Term 2").
+        """
+        return (self.session.name, self.name)
+
 class StudentClass(models.Model):
     """
     Represents a Class or Grade level (e.g., Grade 1, Form 4).
     """
     name = models.CharField(max_length=50, unique=True, help_text="e.g. Grade 1")
+
+    # Year-end promotion mapping (see apps.students.promotion)
+    next_class = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='previous_classes',
+        help_text="Class its students move to at year end"
+    )
+    graduates = models.BooleanField(default=False, help_text="Students in this class graduate at year end")
     
     class Meta:
         verbose_name_plural = "Student Classes"
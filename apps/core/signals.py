@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from .utils import invalidate_home_stats
+
+def home_stats_changed(sender, **kwargs):
+    """
+    Any Transaction or Student write may change the home dashboard figures.
+    """
+    invalidate_home_stats()
+
+for model in ('finance.Transaction', 'students.Student'):
+    post_save.connect(home_stats_changed, sender=model, dispatch_uid=f'home_stats_{model}_save')
+    post_delete.connect(home_stats_changed, sender=model, dispatch_uid=f'home_stats_{model}_delete')
@@ -5,6 +5,7 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('classes/', views.class_list, name='class_list'),
     path('classes/add/', views.class_create, name='class_create'),
+    path('classes/promote/', views.class_promotion, name='class_promotion'),
     path('classes/<int:pk>/edit/', views.class_update, name='class_update'),
     path('classes/<int:pk>/delete/', views.class_delete, name='class_delete'),
 ]
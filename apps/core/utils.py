@@ -0,0 +1,59 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum, Q
+
+HOME_STATS_KEY = 'core:home_stats'
+HOME_STATS_DIRTY_KEY = 'core:home_stats:dirty'
+
+def compute_home_stats():
+    """
+    Computes the admin dashboard figures.
+    The two ledger totals come from one conditional-aggregation query on the daily rollup.
+    """
+    from apps.students.models import Student
+    from apps.finance.models import Transaction, DailyCollectionSummary
+
+    totals = DailyCollectionSummary.objects.aggregate(
+        total_collected=Sum('total_amount', filter=Q(transaction_type=Transaction.TransactionType.PAYMENT)),
+        expected_revenue=Sum('total_amount', filter=Q(transaction_type=Transaction.TransactionType.INVOICE)),
+    )
+    return {
+        'total_students': Student.objects.count(),
+        'total_collected': totals['total_collected'] or 0,
+        'expected_revenue': totals['expected_revenue'] or 0,
+        'computed_at': time.time(),
+    }
+
+def get_home_stats():
+    """
+    Returns the cached dashboard figures, recomputing them when needed.
+
+    Writes to Transaction/Student mark the cache as dirty (see signals.py).
+    A dirty entry is recomputed once it is older than HOME_STATS_MAX_STALENESS
+    seconds, so during busy periods the figures can lag by at most that much
+    instead of being recomputed after every payment. 0 means always fresh.
+    """
+    cached = cache.get_many([HOME_STATS_KEY, HOME_STATS_DIRTY_KEY])
+    stats = cached.get(HOME_STATS_KEY)
+
+    if stats is not None and cached.get(HOME_STATS_DIRTY_KEY):
+        max_staleness = getattr(settings, 'HOME_STATS_MAX_STALENESS', 0)
+        if time.time() - stats['computed_at'] >= max_staleness:
+            stats = None
+
+    if stats is None:
+        # Clear the flag first so writes made while computing mark it dirty again
+        cache.delete(HOME_STATS_DIRTY_KEY)
+        stats = compute_home_stats()
+        cache.set(HOME_STATS_KEY, stats, getattr(settings, 'HOME_STATS_CACHE_TIMEOUT', 300))
+    return stats
+
+def invalidate_home_stats():
+    """
+    Marks the cached dashboard figures as out of date, once the current
+    transaction commits (a request recomputing them before that would cache
+    the old figures again).
+    """
+    transaction.on_commit(lambda: cache.set(HOME_STATS_DIRTY_KEY, True, None))
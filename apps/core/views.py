@@ -1,9 +1,7 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 
-from django.db.models import Sum
-from apps.students.models import Student
-from apps.finance.models import Transaction
+from .utils import get_home_stats
 
 @login_required
 def home(request):
@@ -12,29 +10,20 @@ def home(request):
     Acts as a 'Dispatcher' or 'Router'.
     """
     
-    # Calculate Stats
-    total_students = Student.objects.count()
-    
-    # Sum of all 'PAYMENT' transactions
-    total_collected = Transaction.objects.filter(
-        transaction_type=Transaction.TransactionType.PAYMENT
-    ).aggregate(Sum('amount'))['amount__sum'] or 0
-    
-    # Sum of all 'INVOICE' transactions (Expected Revenue)
-    total_invoiced = Transaction.objects.filter(
-        transaction_type=Transaction.TransactionType.INVOICE
-    ).aggregate(Sum('amount'))['amount__sum'] or 0
-    
     # === DISPATCHER LOGIC ===
+    # Redirect before doing any work: only admins see the stats below.
     if request.user.role == 'STUDENT':
         return redirect('student_portal')
     elif request.user.role == 'BURSAR':
         return redirect('bursar_dashboard')
     
+    # Cached; recomputed after Transaction/Student writes (see core.utils)
+    stats = get_home_stats()
+    
     context = {
-        'total_students': total_students,
-        'total_collected': total_collected,
-        'expected_revenue': total_invoiced,
+        'total_students': stats['total_students'],
+        'total_collected': stats['total_collected'],
+        'expected_revenue': stats['expected_revenue'],
     }
     
     return render(request, 'core/index.html', context)
@@ -83,3 +72,58 @@ def class_delete(request, pk):
         messages.success(request, 'Class deleted successfully!')
         return redirect('class_list')
     return render(request, 'core/student_class_confirm_delete.html', {'object': student_class})
+
+@login_required
+def class_promotion(request):
+    """
+    Year-end promotion: choose where each class moves (or graduates),
+    preview the numbers, then promote everyone in one go.
+    """
+    from apps.students.promotion import (
+        GRADUATE, plan_token, preview_promotion, promote_students, save_mapping, stored_mapping,
+    )
+    from apps.audit.utils import get_client_ip
+
+    if request.user.role != 'ADMIN':
+        messages.error(request, "Only administrators can promote classes.")
+        return redirect('class_list')
+
+    classes = list(StudentClass.objects.all().order_by('name'))
+    class_ids = {c.id for c in classes}
+
+    if request.method == 'POST':
+        mapping = {}
+        for student_class in classes:
+            target = request.POST.get(f'map_{student_class.id}', '')
+            if target == GRADUATE:
+                mapping[student_class.id] = GRADUATE
+            elif target.isdigit() and int(target) in class_ids and int(target) != student_class.id:
+                mapping[student_class.id] = int(target)
+        save_mapping(mapping)
+
+        if 'promote' in request.POST:
+            try:
+                plan = promote_students(
+                    mapping, actor=request.user, ip_address=get_client_ip(request),
+                    token=request.POST.get('plan_token', ''),
+                )
+            except ValueError as e:
+                messages.error(request, str(e))
+                return redirect('class_promotion')
+            moved = sum(step['count'] for step in plan)
+            messages.success(request, f"Promotion complete: {moved} student(s) moved or graduated.")
+            return redirect('class_list')
+    else:
+        mapping = stored_mapping()
+
+    for student_class in classes:
+        student_class.target = mapping.get(student_class.id)
+
+    plan = preview_promotion(mapping)
+    context = {
+        'classes': classes,
+        'plan': plan,
+        'plan_token': plan_token(plan),
+        'graduate': GRADUATE,
+    }
+    return render(request, 'core/class_promotion.html', context)
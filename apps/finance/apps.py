@@ -13,3 +13,7 @@ class FinanceConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.finance'
+
+    def ready(self):
+        # Register signal handlers (balance and rollup upkeep on delete, receipt cache)
+        from . import signals  # noqa: F401
@@ -0,0 +1,164 @@
+"""
+Bulk PDF export: many documents rendered across processes, streamed as a ZIP.
+
+PDF rendering is CPU bound and holds the GIL, so documents are rendered in a
+ProcessPoolExecutor. Each finished document is written to the ZIP and the
+compressed bytes are yielded straight away; at most a few documents per worker
+are in flight, so memory stays flat however many documents are exported.
+
+Receipts go through the on-disk receipt cache (see receipts), so exporting
+the same day twice only renders it once.
+"""
+import logging
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from django.db import connections
+from django.utils.text import get_valid_filename
+from apps.students.models import Enrollment
+from .models import Transaction
+
+logger = logging.getLogger(__name__)
+
+# Documents queued per worker process: keeps every worker busy without
+# holding the whole batch in memory
+IN_FLIGHT_PER_WORKER = 4
+
+
+def init_pdf_worker():
+    # Pool processes may be spawned rather than forked: load the settings
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+    from django.conf import settings
+    if settings.PDF_WORKER_PREWARM:
+        from .pdf import warm_up
+        warm_up()
+
+
+def select_receipts(start_date=None, end_date=None, class_id=None, term_id=None):
+    """
+    Payments to export: posted within the dates, by students of a class
+    (their current class), or by students enrolled in a term (and class).
+    """
+    payments = Transaction.objects.filter(transaction_type=Transaction.TransactionType.PAYMENT)
+    if start_date:
+        payments = payments.filter(posted_on__gte=start_date)
+    if end_date:
+        payments = payments.filter(posted_on__lte=end_date)
+    if term_id:
+        enrolled = Enrollment.objects.filter(term_id=term_id)
+        if class_id:
+            enrolled = enrolled.filter(student_class_id=class_id)
+        payments = payments.filter(student_id__in=enrolled.values('student_id'))
+    elif class_id:
+        payments = payments.filter(student__current_class_id=class_id)
+    return payments.order_by('date', 'id')
+
+
+def receipt_entry(transaction_id):
+    """
+    Renders one receipt (in a worker process). Returns (filename, pdf bytes);
+    the bytes are None if rendering failed.
+    """
+    from .receipts import receipt_pdf
+
+    transaction = Transaction.objects.select_related('student', 'student_class').get(id=transaction_id)
+    name = get_valid_filename(f"Receipt_{transaction.reference_number or transaction.id}.pdf")
+    return name, receipt_pdf(transaction)
+
+
+def receipt_label(transaction_id):
+    """How a receipt that could not be rendered is listed in FAILED.txt."""
+    return f"Receipt for transaction {transaction_id}"
+
+
+def render_documents(render, keys, workers=None, describe=str):
+    """
+    Yields render(key) for every key, in completion order.
+    render must be a module-level function (it is sent to the worker processes)
+    returning (filename, content). A key whose render raises (e.g. its row was
+    deleted meanwhile) yields (describe(key), None) instead, so one bad
+    document is listed as failed rather than cutting the stream short.
+    workers defaults to one per CPU (for the export commands; web downloads pass
+    settings.PDF_EXPORT_WORKERS); 0 renders in this process.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not workers:
+        for key in keys:
+            try:
+                yield render(key)
+            except Exception:
+                logger.exception("Could not render %s", describe(key))
+                yield describe(key), None
+        return
+
+    # Children must not inherit open database connections
+    for connection in connections.all():
+        if not connection.in_atomic_block:
+            connection.close()
+
+    def results(done):
+        for future in done:
+            key = pending.pop(future)
+            try:
+                yield future.result()
+            except Exception:
+                logger.exception("Could not render %s", describe(key))
+                yield describe(key), None
+
+    keys = iter(keys)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_pdf_worker) as executor:
+        pending = {}
+        for key in keys:
+            pending[executor.submit(render, key)] = key
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from results(done)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from results(done)
+
+
+class ZipBuffer:
+    """A write-only file for ZipFile whose contents are taken out as they arrive."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_zip(documents):
+    """
+    Yields a ZIP archive of (filename, content) pairs chunk by chunk.
+    Documents whose content is None are listed in a FAILED.txt entry instead.
+    """
+    buffer = ZipBuffer()
+    failed = []
+    seen = set()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in documents:
+            if content is None:
+                failed.append(name)
+                continue
+            if name in seen:
+                name = f"{len(seen)}_{name}"
+            seen.add(name)
+            archive.writestr(name, content)
+            yield buffer.take()
+        if failed:
+            archive.writestr('FAILED.txt', "Could not render:\n" + "\n".join(failed) + "\n")
+    yield buffer.take()
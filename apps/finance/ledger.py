@@ -0,0 +1,115 @@
+"""
+A student's ledger, newest first, with a running balance.
+
+One query per page: window functions add the balance after each transaction
+and, on the first page, the student's totals. History pages are keyset
+paginated on (date, id), following the txn_student_date_idx index.
+
+Older pages only need the rows before the cursor: a transaction's running
+balance depends on the transactions before it and nothing after, so the
+window over the filtered rows still gives the true balance.
+"""
+import datetime
+from decimal import Decimal
+from dataclasses import dataclass, field
+from django.db import models
+from django.db.models import Case, Count, F, Q, Sum, Value, When, Window
+from .models import Transaction
+
+HISTORY_PAGE_SIZE = 25
+
+MONEY = models.DecimalField(max_digits=14, decimal_places=2)
+CENTS = Decimal('0.01')
+
+
+@dataclass
+class LedgerPage:
+    transactions: list = field(default_factory=list)
+    total_invoiced: object = 0  # totals are only computed on the first page
+    total_paid: object = 0
+    transaction_count: int = 0
+    next_cursor: str = None  # cursor of the next (older) page, None on the last one
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(transaction):
+    return f"{transaction.date.isoformat()}_{transaction.id}"
+
+
+def decode_cursor(value):
+    """
+    Turns a cursor back into its (date, id) keyset. Returns None if invalid.
+    """
+    if not value:
+        return None
+    date, _, transaction_id = value.rpartition('_')
+    try:
+        return datetime.datetime.fromisoformat(date), int(transaction_id)
+    except ValueError:
+        return None
+
+
+def signed_amount():
+    """Transaction.signed_amount as an expression."""
+    return Case(
+        When(transaction_type__in=Transaction.CREDIT_TYPES, then=-F('amount')),
+        default=F('amount'),
+        output_field=MONEY,
+    )
+
+
+def student_ledger(student_id, limit=HISTORY_PAGE_SIZE, cursor=None):
+    """
+    One page of a student's transactions, newest first, each with a
+    running_balance attribute (the balance right after it).
+    Without a cursor this is the first page and also carries the totals.
+    """
+    keyset = decode_cursor(cursor)
+    transactions = Transaction.objects.filter(student_id=student_id)
+    if keyset:
+        date, transaction_id = keyset
+        transactions = transactions.filter(Q(date__lt=date) | Q(id__lt=transaction_id), date__lte=date)
+
+    transactions = transactions.annotate(
+        running_balance=Window(Sum(signed_amount()), order_by=[F('date').asc(), F('id').asc()]),
+    )
+    if keyset is None:
+        transactions = transactions.annotate(
+            total_invoiced=Window(Sum(Case(
+                When(transaction_type=Transaction.TransactionType.INVOICE, then=F('amount')),
+                default=Value(0), output_field=MONEY,
+            ))),
+            total_paid=Window(Sum(Case(
+                When(transaction_type__in=Transaction.CREDIT_TYPES, then=F('amount')),
+                default=Value(0), output_field=MONEY,
+            ))),
+            transaction_count=Window(Count('id')),
+        )
+
+    rows = list(transactions.order_by('-date', '-id')[:limit + 1])
+    page = LedgerPage(transactions=rows[:limit])
+    # SQLite sums decimals as floats; round them back to cents
+    for row in page.transactions:
+        row.running_balance = Decimal(row.running_balance).quantize(CENTS)
+    if len(rows) > limit:
+        page.next_cursor = encode_cursor(rows[limit - 1])
+    if keyset is None and rows:
+        page.total_invoiced = Decimal(rows[0].total_invoiced).quantize(CENTS)
+        page.total_paid = Decimal(rows[0].total_paid).quantize(CENTS)
+        page.transaction_count = rows[0].transaction_count
+    return page
+
+
+def balance_after(transaction):
+    """
+    The student's balance right after the given transaction (as at its date),
+    which, unlike current_balance, does not change as later payments arrive.
+    """
+    total = Transaction.objects.filter(
+        Q(date__lt=transaction.date) | Q(id__lte=transaction.id),
+        student_id=transaction.student_id, date__lte=transaction.date,
+    ).aggregate(balance=Sum(signed_amount()))['balance']
+    return Decimal(total or 0).quantize(CENTS)
@@ -0,0 +1,56 @@
+import datetime
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.models import StudentClass, Term
+from apps.finance.batch import receipt_entry, receipt_label, render_documents, select_receipts, stream_zip
+
+
+class Command(BaseCommand):
+    help = "Writes the receipts for a date range, class and/or term into a ZIP file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="ZIP file to write")
+        parser.add_argument('--date', help="Payments posted on this date (YYYY-MM-DD)")
+        parser.add_argument('--from', dest='start_date', help="Payments posted on or after this date")
+        parser.add_argument('--to', dest='end_date', help="Payments posted on or before this date")
+        parser.add_argument('--class-name', help="Students of this class (by name)")
+        parser.add_argument('--term-id', type=int, help="Students enrolled in this term (with --class-name: in that class)")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Rendering processes (default: one per CPU, 0 = no pool)")
+
+    def parse_date(self, value):
+        if not value:
+            return None
+        try:
+            return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        start_date = self.parse_date(options['date'] or options['start_date'])
+        end_date = self.parse_date(options['date'] or options['end_date'])
+
+        class_id = None
+        if options['class_name']:
+            class_id = StudentClass.objects.filter(name__iexact=options['class_name']).values_list('id', flat=True).first()
+            if class_id is None:
+                raise CommandError(f"Unknown class '{options['class_name']}'")
+        if options['term_id'] and not Term.objects.filter(id=options['term_id']).exists():
+            raise CommandError(f"No term with id {options['term_id']}")
+        if not (start_date or end_date or class_id or options['term_id']):
+            raise CommandError("Choose a date, class or term (--date, --from/--to, --class-name, --term-id)")
+
+        transaction_ids = list(
+            select_receipts(start_date, end_date, class_id, options['term_id']).values_list('id', flat=True)
+        )
+        start = time.perf_counter()
+        with open(options['output'], 'wb') as f:
+            for chunk in stream_zip(render_documents(
+                receipt_entry, transaction_ids, workers=options['workers'], describe=receipt_label
+            )):
+                f.write(chunk)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(transaction_ids)} receipt(s) to {options['output']} in {elapsed:.1f}s."
+        ))
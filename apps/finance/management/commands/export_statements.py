@@ -0,0 +1,84 @@
+import datetime
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.core.models import StudentClass, Term
+from apps.finance.batch import render_documents, stream_zip
+from apps.finance.statements import (
+    build_statements, class_students, render_statements_pdf, statement_entry, statement_label, term_period,
+)
+from apps.students.models import Student
+
+
+class Command(BaseCommand):
+    help = "Writes fee statements for a student or class, as one PDF (.pdf) or a ZIP of PDFs (.zip)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="File to write (.pdf or .zip)")
+        who = parser.add_mutually_exclusive_group(required=True)
+        who.add_argument('--admission-number', help="One student")
+        who.add_argument('--class-name', help="Every student of a class")
+        parser.add_argument('--term-id', type=int, help="Statement period: this term (default: the current term)")
+        parser.add_argument('--from', dest='start_date', help="Statement period start (YYYY-MM-DD)")
+        parser.add_argument('--to', dest='end_date', help="Statement period end (YYYY-MM-DD, default today)")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Rendering processes for .zip output (default: one per CPU, 0 = no pool)")
+
+    def parse_date(self, value):
+        if not value:
+            return None
+        try:
+            return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        if not options['output'].endswith(('.pdf', '.zip')):
+            raise CommandError("The output file must end in .pdf or .zip")
+
+        term = None
+        start_date = self.parse_date(options['start_date'])
+        end_date = self.parse_date(options['end_date'])
+        if start_date or end_date:
+            start_date = start_date or end_date
+            end_date = end_date or timezone.localdate()
+        else:
+            terms = Term.objects.select_related('session')
+            term = terms.filter(id=options['term_id']).first() if options['term_id'] else terms.filter(is_current=True).first()
+            if term is None:
+                raise CommandError("No such term; pass --term-id or --from/--to")
+            period = term_period(term)
+            if period is None:
+                raise CommandError(f"Nothing has been invoiced for {term} yet; pass --from/--to")
+            start_date, end_date = period
+
+        if options['admission_number']:
+            students = Student.objects.filter(admission_number=options['admission_number'])
+        else:
+            class_id = StudentClass.objects.filter(name__iexact=options['class_name']).values_list('id', flat=True).first()
+            if class_id is None:
+                raise CommandError(f"Unknown class '{options['class_name']}'")
+            students = class_students(class_id, term)
+
+        start = time.perf_counter()
+        statements = build_statements(students, start_date, end_date, term)
+        if not statements:
+            raise CommandError("No students found")
+
+        if options['output'].endswith('.zip'):
+            with open(options['output'], 'wb') as f:
+                for chunk in stream_zip(render_documents(
+                    statement_entry, statements, workers=options['workers'], describe=statement_label
+                )):
+                    f.write(chunk)
+        else:
+            pdf = render_statements_pdf(statements)
+            if pdf is None:
+                raise CommandError("Could not render the statements")
+            with open(options['output'], 'wb') as f:
+                f.write(pdf)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(statements)} statement(s) ({start_date} to {end_date}) to {options['output']} in {elapsed:.1f}s."
+        ))
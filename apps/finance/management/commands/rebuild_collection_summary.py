@@ -0,0 +1,26 @@
+import datetime
+from django.core.management.base import BaseCommand, CommandError
+from apps.finance.models import DailyCollectionSummary
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the DailyCollectionSummary rollup from the transaction ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start_date', help="First date to rebuild (YYYY-MM-DD)")
+        parser.add_argument('--to', dest='end_date', help="Last date to rebuild (YYYY-MM-DD)")
+
+    def parse_date(self, value):
+        if not value:
+            return None
+        try:
+            return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        start_date = self.parse_date(options['start_date'])
+        end_date = self.parse_date(options['end_date'])
+
+        count = DailyCollectionSummary.rebuild(start_date, end_date)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt daily collection summary: {count} row(s)."))
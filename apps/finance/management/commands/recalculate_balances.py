@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum, Q
+from apps.students.models import Student
+from apps.finance.models import Transaction
+
+
+class Command(BaseCommand):
+    help = "Recalculates every student's cached balance from the full transaction ledger (slow path)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--admission-number', help="Only recalculate this student")
+
+    def handle(self, *args, **options):
+        students = Student.objects.only('id', 'current_balance')
+        if options['admission_number']:
+            students = students.filter(admission_number=options['admission_number'])
+
+        # One grouped aggregate for the whole ledger
+        totals = Transaction.objects.filter(student__in=students).values('student_id').annotate(
+            debt=Sum('amount', filter=Q(transaction_type=Transaction.TransactionType.INVOICE)),
+            credit=Sum('amount', filter=Q(transaction_type__in=Transaction.CREDIT_TYPES)),
+        )
+        balances = {
+            row['student_id']: (row['debt'] or 0) - (row['credit'] or 0)
+            for row in totals
+        }
+
+        changed = []
+        for student in students:
+            balance = balances.get(student.id, 0)
+            if student.current_balance != balance:
+                student.current_balance = balance
+                changed.append(student)
+
+        with transaction.atomic():
+            Student.objects.bulk_update(changed, ['current_balance'], batch_size=500)
+
+        self.stdout.write(self.style.SUCCESS(f"Recalculated balances. {len(changed)} student(s) corrected."))
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.students.models import Student
+from apps.notifications.services import NotificationService
+
+
+class Command(BaseCommand):
+    help = "Queues a fee reminder SMS to the parent of every student with an outstanding balance."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-balance', type=int, default=1, help="Only remind balances of at least this amount")
+        parser.add_argument('--class-id', type=int, help="Only remind parents in this class")
+
+    def handle(self, *args, **options):
+        students = Student.objects.filter(
+            current_balance__gte=options['min_balance']
+        ).exclude(parent_phone='').only('first_name', 'last_name', 'parent_phone', 'current_balance')
+        if options['class_id']:
+            students = students.filter(current_class_id=options['class_id'])
+
+        messages = (
+            {
+                'recipient': student.parent_phone,
+                'body': f"Reminder: {settings.SCHOOL_NAME} fee balance for {student.full_name} is KES {student.current_balance}. Kindly clear it at your earliest convenience.",
+            }
+            for student in students.iterator(chunk_size=2000)
+        )
+        queued = NotificationService.send_bulk(messages)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Queued {queued} fee reminder(s). Run 'manage.py process_notifications' to send them."
+        ))
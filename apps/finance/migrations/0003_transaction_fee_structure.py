@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0002_transaction_is_viewed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='fee_structure',
+            field=models.ForeignKey(blank=True, help_text='The Fee this invoice was generated from (INVOICE only)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoices', to='finance.feestructure'),
+        ),
+    ]
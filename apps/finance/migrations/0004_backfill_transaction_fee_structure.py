@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+def backfill_fee_structure(apps, schema_editor):
+    """
+    Links existing invoices to their FeeStructure by parsing the
+    INV-{term}-{student}-{fee} reference number. The term part may itself
+    contain dashes, so the reference is split from the right.
+    """
+    Transaction = apps.get_model('finance', 'Transaction')
+    FeeStructure = apps.get_model('finance', 'FeeStructure')
+
+    term_names = dict(FeeStructure.objects.values_list('id', 'term__name'))
+
+    to_update = []
+    invoices = Transaction.objects.filter(
+        transaction_type='INVOICE',
+        fee_structure__isnull=True,
+        reference_number__startswith='INV-',
+    ).only('id', 'student_id', 'reference_number')
+
+    for invoice in invoices.iterator(chunk_size=2000):
+        parts = invoice.reference_number[len('INV-'):].rsplit('-', 2)
+        if len(parts) != 3:
+            continue
+        term_name, student_id, fee_id = parts
+        if not (student_id.isdigit() and fee_id.isdigit()):
+            continue
+        fee_id = int(fee_id)
+        # Only trust the match if every part of the reference agrees
+        if int(student_id) != invoice.student_id or term_names.get(fee_id) != term_name:
+            continue
+        invoice.fee_structure_id = fee_id
+        to_update.append(invoice)
+
+    Transaction.objects.bulk_update(to_update, ['fee_structure'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0003_transaction_fee_structure'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_fee_structure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_posted_on(apps, schema_editor):
+    """
+    Fills posted_on with the local (settings.TIME_ZONE) date of each transaction.
+    """
+    Transaction = apps.get_model('finance', 'Transaction')
+
+    batch = []
+    for txn in Transaction.objects.only('id', 'date').iterator(chunk_size=2000):
+        txn.posted_on = timezone.localdate(txn.date) if timezone.is_aware(txn.date) else txn.date.date()
+        batch.append(txn)
+        if len(batch) >= 2000:
+            Transaction.objects.bulk_update(batch, ['posted_on'])
+            batch = []
+    Transaction.objects.bulk_update(batch, ['posted_on'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0005_transaction_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='posted_on',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_posted_on, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='transaction',
+            name='posted_on',
+            field=models.DateField(editable=False, help_text="Local (school timezone) calendar date of 'date', kept for indexed date-range reports"),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['transaction_type', 'posted_on'], name='txn_type_posted_on_idx'),
+        ),
+    ]
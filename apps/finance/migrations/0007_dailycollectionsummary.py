@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_summary(apps, schema_editor):
+    """
+    Builds the initial rollup from the existing ledger.
+    """
+    Transaction = apps.get_model('finance', 'Transaction')
+    DailyCollectionSummary = apps.get_model('finance', 'DailyCollectionSummary')
+
+    rows = Transaction.objects.values('posted_on', 'transaction_type', 'student__current_class').annotate(
+        total=models.Sum('amount'), count=models.Count('id')
+    ).order_by()
+    DailyCollectionSummary.objects.bulk_create([
+        DailyCollectionSummary(
+            date=row['posted_on'],
+            transaction_type=row['transaction_type'],
+            student_class_id=row['student__current_class'],
+            total_amount=row['total'],
+            transaction_count=row['count'],
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('finance', '0006_transaction_posted_on'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCollectionSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Local posting date (Transaction.posted_on)')),
+                ('transaction_type', models.CharField(choices=[('INVOICE', 'Invoice (Charge)'), ('PAYMENT', 'Payment (Credit)'), ('WAIVER', 'Waiver (Credit)')], max_length=20)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('transaction_count', models.IntegerField(default=0)),
+                ('student_class', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.studentclass')),
+            ],
+            options={
+                'verbose_name_plural': 'Daily Collection Summaries',
+                'indexes': [models.Index(fields=['transaction_type', 'date'], name='summary_type_date_idx')],
+                'unique_together': {('date', 'transaction_type', 'student_class')},
+            },
+        ),
+        migrations.RunPython(populate_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_student_class(apps, schema_editor):
+    """
+    Records each transaction's class: the fee's class for invoices generated
+    from a fee (the class billed at the time), the student's current class for
+    the rest. Then rebuilds the rollup on those classes, so later edits and
+    deletes reverse into the buckets that hold them.
+    """
+    Transaction = apps.get_model('finance', 'Transaction')
+    FeeStructure = apps.get_model('finance', 'FeeStructure')
+    Student = apps.get_model('students', 'Student')
+    DailyCollectionSummary = apps.get_model('finance', 'DailyCollectionSummary')
+
+    Transaction.objects.filter(fee_structure__isnull=False).update(student_class_id=models.Subquery(
+        FeeStructure.objects.filter(pk=models.OuterRef('fee_structure_id')).values('student_class_id')[:1]
+    ))
+    Transaction.objects.filter(student_class__isnull=True).update(student_class_id=models.Subquery(
+        Student.objects.filter(pk=models.OuterRef('student_id')).values('current_class_id')[:1]
+    ))
+
+    rows = Transaction.objects.values('posted_on', 'transaction_type', 'student_class').annotate(
+        total=models.Sum('amount'), count=models.Count('id')
+    ).order_by()
+    DailyCollectionSummary.objects.all().delete()
+    DailyCollectionSummary.objects.bulk_create([
+        DailyCollectionSummary(
+            date=row['posted_on'],
+            transaction_type=row['transaction_type'],
+            student_class_id=row['student_class'],
+            total_amount=row['total'],
+            transaction_count=row['count'],
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_class_promotion_mapping'),
+        ('finance', '0007_dailycollectionsummary'),
+        ('students', '0004_enrollment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='student_class',
+            field=models.ForeignKey(blank=True, editable=False, help_text="The student's class when the transaction was posted", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.studentclass'),
+        ),
+        migrations.RunPython(backfill_student_class, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from apps.core.models import StudentClass, Term
 from apps.students.models import Student
@@ -34,28 +34,272 @@ class Transaction(models.Model):
     transaction_type = models.CharField(max_length=20, choices=TransactionType.choices)
     amount = models.DecimalField(max_digits=10, decimal_places=2, help_text="Always positive value")
     date = models.DateTimeField(default=timezone.now)
+    posted_on = models.DateField(
+        editable=False,
+        help_text="Local (school timezone) calendar date of 'date', kept for indexed date-range reports"
+    )
     description = models.CharField(max_length=255)
     reference_number = models.CharField(max_length=50, unique=True, null=True, blank=True, help_text="e.g. Receipt No or Invoice No")
     is_viewed = models.BooleanField(default=False)
+    fee_structure = models.ForeignKey(
+        FeeStructure,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='invoices',
+        help_text="The Fee this invoice was generated from (INVOICE only)"
+    )
+    # Kept so the daily collection rollup can be reversed into the bucket it was
+    # recorded in, even after the student changes class (e.g. promotion)
+    student_class = models.ForeignKey(
+        StudentClass,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        help_text="The student's class when the transaction was posted"
+    )
+
+    class Meta:
+        # Designed around the dashboard and ledger access patterns:
+        # - per-student totals filter by (student, transaction_type)
+        # - per-student history orders by date
+        # - recent payments filter by type and order by date
+        # - daily collection and date-bucketed reports filter by type and posted_on range
+        # - the portal only touches a student's unviewed invoices
+        indexes = [
+            models.Index(fields=['student', 'transaction_type'], name='txn_student_type_idx'),
+            models.Index(fields=['student', 'date'], name='txn_student_date_idx'),
+            models.Index(fields=['transaction_type', 'date'], name='txn_type_date_idx'),
+            models.Index(fields=['transaction_type', 'posted_on'], name='txn_type_posted_on_idx'),
+            models.Index(
+                fields=['student'],
+                condition=models.Q(transaction_type='INVOICE', is_viewed=False),
+                name='txn_unviewed_invoice_idx',
+            ),
+        ]
+
+    # Credits reduce the balance, everything else (INVOICE) increases it.
+    CREDIT_TYPES = (TransactionType.PAYMENT, TransactionType.WAIVER)
+
+    @property
+    def signed_amount(self):
+        """
+        The effect of this transaction on the student's balance.
+        Positive for INVOICE (debt), negative for PAYMENT and WAIVER (credit).
+        """
+        if self.transaction_type in self.CREDIT_TYPES:
+            return -self.amount
+        return self.amount
+
+    @staticmethod
+    def local_posting_date(value):
+        """
+        The calendar date of a datetime in the school's timezone (settings.TIME_ZONE).
+        Naive datetimes are assumed to already be local.
+        """
+        if timezone.is_aware(value):
+            return timezone.localdate(value)
+        return value.date()
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.update_student_balance()
+        """
+        Saves the transaction and applies its balance delta and daily collection
+        rollup in the same DB transaction.
+        New rows add their signed amount; edits apply only the difference.
+        """
+        self.posted_on = self.local_posting_date(self.date)
+        if kwargs.get('update_fields') is not None and 'date' in kwargs['update_fields']:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'posted_on'}
+
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = Transaction.objects.filter(pk=self.pk).only(
+                    'student_id', 'transaction_type', 'amount', 'date', 'posted_on', 'student_class_id'
+                ).first()
+            # The row as it was before this save: its old receipts are dropped too (see signals)
+            self._previous = previous
+
+            # Posted (or moved to another student): record the student's class now
+            if previous is None or previous.student_id != self.student_id:
+                self.student_class_id = self.current_class_id()
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], 'student_class'}
+
+            super().save(*args, **kwargs)
+
+            if previous is None:
+                self.apply_balance_delta(self.student_id, self.signed_amount)
+            elif previous.student_id != self.student_id:
+                # Moved to another student: reverse on the old, apply on the new
+                self.apply_balance_delta(previous.student_id, -previous.signed_amount)
+                self.apply_balance_delta(self.student_id, self.signed_amount)
+            else:
+                self.apply_balance_delta(self.student_id, self.signed_amount - previous.signed_amount)
+
+            self.update_collection_summary(previous)
+
+        # Keep an already loaded student instance in sync (e.g. for the receipt SMS)
+        if Transaction.student.is_cached(self):
+            self.student.refresh_from_db(fields=['current_balance'])
+
+    @staticmethod
+    def apply_balance_delta(student_id, delta):
+        """
+        Atomically adjusts a student's cached balance by delta using an F() expression.
+        This is O(1) regardless of ledger length and safe against concurrent saves.
+        """
+        if delta:
+            Student.objects.filter(pk=student_id).update(
+                current_balance=models.F('current_balance') + delta
+            )
+
+    @staticmethod
+    def mark_invoices_viewed(student_id):
+        """
+        Flags a student's unviewed invoices as viewed; returns how many changed.
+        Most portal visits find nothing new, so check first: the EXISTS probe is an
+        indexed read of the student's invoices, while an UPDATE takes SQLite's
+        write lock even when it matches no rows.
+        """
+        unviewed = Transaction.objects.filter(
+            student_id=student_id,
+            transaction_type=Transaction.TransactionType.INVOICE,
+            is_viewed=False,
+        )
+        if not unviewed.exists():
+            return 0
+        return unviewed.update(is_viewed=True)
+
+    def current_class_id(self):
+        """
+        The class the student is in now; stored as student_class when posted.
+        """
+        if Transaction.student.is_cached(self):
+            return self.student.current_class_id
+        return Student.objects.filter(pk=self.student_id).values_list('current_class_id', flat=True).first()
+
+    def update_collection_summary(self, previous=None):
+        """
+        Keeps DailyCollectionSummary in step with a saved transaction.
+        previous is the row as it was before an edit (None for new rows).
+        Buckets are keyed on the class stored at posting time, not the current one.
+        """
+        class_id = self.student_class_id
+        if previous is None:
+            DailyCollectionSummary.record(self.posted_on, self.transaction_type, class_id, self.amount, 1)
+            return
+
+        previous_class_id = previous.student_class_id
+        same_bucket = (
+            previous.posted_on == self.posted_on
+            and previous.transaction_type == self.transaction_type
+            and previous_class_id == class_id
+        )
+        if same_bucket:
+            DailyCollectionSummary.record(self.posted_on, self.transaction_type, class_id, self.amount - previous.amount, 0)
+        else:
+            DailyCollectionSummary.record(previous.posted_on, previous.transaction_type, previous_class_id, -previous.amount, -1)
+            DailyCollectionSummary.record(self.posted_on, self.transaction_type, class_id, self.amount, 1)
 
     def update_student_balance(self):
         """
-        Recalculates the student's cached balance.
-        Debt = Sum of Invoices
-        Credit = Sum of Payments + Waivers
-        Balance = Debt - Credit
+        Slow path: recalculates the student's balance from their full ledger.
+        Use it to repair drift, e.g. after raw SQL or queryset.update() changes.
         """
-        # We'll implement a signal or method on the Student model to do this more efficiently
-        # later, but for now, this simple logic explains the intent.
-        total_invoices = self.student.transactions.filter(transaction_type=self.TransactionType.INVOICE).aggregate(models.Sum('amount'))['amount__sum'] or 0
-        total_payments = self.student.transactions.filter(transaction_type__in=[self.TransactionType.PAYMENT, self.TransactionType.WAIVER]).aggregate(models.Sum('amount'))['amount__sum'] or 0
-        
-        self.student.current_balance = total_invoices - total_payments
-        self.student.save()
+        self.student.recalculate_balance()
 
     def __str__(self):
         return f"{self.transaction_type} - {self.student} - {self.amount}"
+
+class DailyCollectionSummary(models.Model):
+    """
+    Materialized rollup of the ledger: totals and counts per day, transaction type and class.
+    Updated incrementally on every Transaction write, so dashboards read a handful of
+    rows instead of summing the ledger. Rebuild with 'manage.py rebuild_collection_summary'.
+    """
+    date = models.DateField(help_text="Local posting date (Transaction.posted_on)")
+    transaction_type = models.CharField(max_length=20, choices=Transaction.TransactionType.choices)
+    student_class = models.ForeignKey(StudentClass, on_delete=models.SET_NULL, null=True, blank=True)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transaction_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('date', 'transaction_type', 'student_class')
+        indexes = [
+            models.Index(fields=['transaction_type', 'date'], name='summary_type_date_idx'),
+        ]
+        verbose_name_plural = "Daily Collection Summaries"
+
+    @classmethod
+    def record(cls, date, transaction_type, student_class_id, amount, count):
+        """
+        Adds amount and count to a bucket, creating it if needed.
+        Uses F() expressions so concurrent writers don't overwrite each other.
+        """
+        if not amount and not count:
+            return
+        # Target a single row: deleting a class moves its buckets to NULL, and NULLs
+        # are distinct in the unique constraint, so the NULL bucket may have several rows.
+        bucket = cls.objects.filter(
+            date=date, transaction_type=transaction_type, student_class_id=student_class_id
+        ).values('pk')[:1]
+        updated = cls.objects.filter(pk__in=models.Subquery(bucket)).update(
+            total_amount=models.F('total_amount') + amount,
+            transaction_count=models.F('transaction_count') + count,
+        )
+        if not updated:
+            cls.objects.create(
+                date=date, transaction_type=transaction_type, student_class_id=student_class_id,
+                total_amount=amount, transaction_count=count,
+            )
+
+    @classmethod
+    def rebuild(cls, start_date=None, end_date=None):
+        """
+        Recomputes the rollup from the ledger (optionally for a date range only).
+        Returns the number of summary rows written.
+        """
+        summaries = cls.objects.all()
+        transactions = Transaction.objects.all()
+        if start_date:
+            summaries = summaries.filter(date__gte=start_date)
+            transactions = transactions.filter(posted_on__gte=start_date)
+        if end_date:
+            summaries = summaries.filter(date__lte=end_date)
+            transactions = transactions.filter(posted_on__lte=end_date)
+
+        rows = transactions.values('posted_on', 'transaction_type', 'student_class').annotate(
+            total=models.Sum('amount'), count=models.Count('id')
+        ).order_by()
+
+        with transaction.atomic():
+            summaries.delete()
+            created = cls.objects.bulk_create([
+                cls(
+                    date=row['posted_on'],
+                    transaction_type=row['transaction_type'],
+                    student_class_id=row['student_class'],
+                    total_amount=row['total'],
+                    transaction_count=row['count'],
+                )
+                for row in rows
+            ], batch_size=500)
+        return len(created)
+
+    @classmethod
+    def total(cls, transaction_type, start_date=None, end_date=None):
+        """
+        Sum of amounts for a transaction type, optionally within a date range (inclusive).
+        """
+        rows = cls.objects.filter(transaction_type=transaction_type)
+        if start_date:
+            rows = rows.filter(date__gte=start_date)
+        if end_date:
+            rows = rows.filter(date__lte=end_date)
+        return rows.aggregate(models.Sum('total_amount'))['total_amount__sum'] or 0
+
+    def __str__(self):
+        return f"{self.date} {self.transaction_type} {self.student_class} ({self.total_amount})"
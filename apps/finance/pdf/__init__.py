@@ -0,0 +1,26 @@
+"""
+PDF rendering service.
+
+Nothing here imports a PDF engine: the backend module (and through it
+ReportLab or xhtml2pdf) is imported the first time a document is rendered, so
+processes that never render a PDF never pay for loading it. Worker processes
+that will render can load it up front with warm_up().
+"""
+from functools import lru_cache
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+@lru_cache(maxsize=None)
+def get_pdf_backend(backend=None):
+    """
+    The PDF backend instance for this process (they are stateless once set up).
+    Defaults to settings.PDF_BACKEND.
+    """
+    path = backend or getattr(settings, 'PDF_BACKEND', 'apps.finance.pdf.direct.PDFBackend')
+    return import_string(path)()
+
+
+def warm_up():
+    """Loads the PDF backend and its engine now rather than on the first document."""
+    get_pdf_backend().warm_up()
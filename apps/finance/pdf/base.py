@@ -0,0 +1,25 @@
+RECEIPT_TEMPLATE = 'finance/pdf/receipt.html'
+
+
+class BasePDFBackend:
+    """
+    Base class for PDF backends.
+
+    render_template() turns an HTML template into a PDF (used for statements);
+    render_receipt() draws a payment receipt, by default through the receipt
+    template. Both return the PDF bytes, or None if rendering failed.
+
+    version identifies the receipt output: the receipt cache key includes it,
+    so bump it whenever a backend's receipt layout changes.
+    """
+    version = '1'
+
+    def warm_up(self):
+        """Loads whatever the backend loads lazily, so the first document is not slower."""
+        pass
+
+    def render_template(self, template_name, context):
+        raise NotImplementedError('subclasses of BasePDFBackend must override render_template()')
+
+    def render_receipt(self, transaction, balance_after):
+        return self.render_template(RECEIPT_TEMPLATE, {'transaction': transaction, 'balance_after': balance_after})
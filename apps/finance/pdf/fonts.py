@@ -0,0 +1,35 @@
+"""
+The TrueType font PDFs use for text outside Latin-1 (e.g. Cyrillic or Greek
+names): PDF_FONT_PATH / PDF_BOLD_FONT_PATH, or DejaVu Sans where installed.
+Without one such text cannot be drawn, so a warning is logged and it comes out
+as blank boxes.
+"""
+import logging
+import os
+from functools import lru_cache
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# (regular, bold) candidates, first found wins
+FONT_CANDIDATES = [
+    ('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'),
+    ('/usr/share/fonts/dejavu/DejaVuSans.ttf', '/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf'),
+    ('/usr/local/share/fonts/dejavu/DejaVuSans.ttf', '/usr/local/share/fonts/dejavu/DejaVuSans-Bold.ttf'),
+]
+
+
+@lru_cache(maxsize=None)
+def font_paths():
+    """(regular, bold) font file paths, or None if there is no Unicode font."""
+    configured = settings.PDF_FONT_PATH
+    if configured:
+        return configured, settings.PDF_BOLD_FONT_PATH or configured
+    for regular, bold in FONT_CANDIDATES:
+        if os.path.exists(regular) and os.path.exists(bold):
+            return regular, bold
+    logger.warning(
+        "No Unicode font for PDFs (install DejaVu Sans or set PDF_FONT_PATH): "
+        "names outside Latin-1 will print as blank boxes"
+    )
+    return None
@@ -0,0 +1,39 @@
+import os
+from io import BytesIO
+from pathlib import Path
+from django.conf import settings
+from django.template.loader import get_template
+from .base import BasePDFBackend
+from .fonts import font_paths
+
+
+class PDFBackend(BasePDFBackend):
+    """
+    Renders HTML templates through xhtml2pdf (HTML/CSS layout, any template).
+    xhtml2pdf takes most of a second to import, so it is loaded on first use.
+
+    Templates get the Unicode font as pdf_font ({'regular': path, 'bold': path},
+    or None) to declare with @font-face; xhtml2pdf's own Helvetica only covers
+    Latin-1. Documents may read files in the project and the font directories.
+    """
+    def warm_up(self):
+        from xhtml2pdf import pisa  # noqa: F401
+
+    def render_template(self, template_name, context):
+        from xhtml2pdf import pisa
+
+        from xhtml2pdf.config.resources import ResourceAccessPolicy
+
+        paths = font_paths()
+        context = {**context, 'pdf_font': {'regular': paths[0], 'bold': paths[1]} if paths else None}
+        html = get_template(template_name).render(context)
+        policy = ResourceAccessPolicy(
+            allow_remote=False,
+            base_dir=Path(settings.BASE_DIR),
+            extra_roots=tuple({Path(os.path.dirname(path)) for path in paths or ()}),
+        )
+        result = BytesIO()
+        pdf = pisa.pisaDocument(BytesIO(html.encode('utf-8')), result, encoding='utf-8', resource_policy=policy)
+        if pdf.err:
+            return None
+        return result.getvalue()
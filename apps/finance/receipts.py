@@ -0,0 +1,161 @@
+"""
+Receipt PDFs, rendered once and served from disk.
+
+A receipt depends on its transaction (including the class the student was in
+when it was posted), on the student's transactions up to it (the balance
+printed is the balance right after it, see ledger.balance_after), on the
+student's name and admission number, and on how receipts are drawn. Files are
+keyed by transaction id and a hash of the PDF backend, its version and the
+receipt template source:
+
+    RECEIPT_CACHE_DIR/{transaction id}-{receipt version}.pdf
+
+Switching backends or editing the template changes the hash, so old files are
+simply never read again and age out. Reading a file bumps its mtime; once the directory grows
+past RECEIPT_CACHE_MAX_BYTES the least recently used files are removed.
+Editing or deleting a transaction, or renaming a student, drops the affected
+receipts (see signals).
+"""
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+from django.conf import settings
+from django.template.loader import get_template
+from .ledger import balance_after
+from .models import Transaction
+from .pdf import get_pdf_backend
+from .pdf.base import RECEIPT_TEMPLATE
+
+
+@lru_cache(maxsize=None)
+def receipt_version():
+    """Short hash of the PDF backend, its version and the template source (once per process)."""
+    backend = get_pdf_backend()
+    digest = hashlib.sha256(f"{type(backend).__module__}.{type(backend).__qualname__}:{backend.version}:".encode())
+    with open(get_template(RECEIPT_TEMPLATE).origin.name, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def cache_dir():
+    return Path(settings.RECEIPT_CACHE_DIR)
+
+
+def cache_path(transaction_id):
+    return cache_dir() / f"{transaction_id}-{receipt_version()}.pdf"
+
+
+def render_receipt(transaction):
+    """Renders the receipt PDF. Returns the bytes, or None if rendering failed."""
+    return get_pdf_backend().render_receipt(transaction, balance_after(transaction))
+
+
+def open_receipt(transaction):
+    """
+    The receipt PDF of a transaction as an open binary file, rendering and
+    storing it on a cache miss. Returns None if rendering failed.
+    """
+    path = cache_path(transaction.id)
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        pass
+    else:
+        os.utime(f.fileno())
+        return f
+
+    content = render_receipt(transaction)
+    if content is None:
+        return None
+    store(path, content)
+    # Open the new file before evicting, so it cannot disappear in between
+    f = open(path, 'rb')
+    evict()
+    return f
+
+
+def receipt_pdf(transaction):
+    """The receipt PDF bytes (e.g. for an email attachment), or None."""
+    f = open_receipt(transaction)
+    if f is None:
+        return None
+    with f:
+        return f.read()
+
+
+def store(path, content):
+    # Write then rename, so readers never see a partial file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def evict(max_bytes=None):
+    """
+    Removes least recently used receipts until the cache fits in max_bytes
+    (default RECEIPT_CACHE_MAX_BYTES). Returns the number of files removed.
+    """
+    if max_bytes is None:
+        max_bytes = settings.RECEIPT_CACHE_MAX_BYTES
+    files = []
+    total = 0
+    for entry in os.scandir(cache_dir()):
+        if entry.name.endswith('.pdf'):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def invalidate_receipts(transaction_ids):
+    """
+    Drops the cached receipts of these transactions. Files rendered from an
+    older template or backend are never read again, so only the current version matters.
+    """
+    for transaction_id in transaction_ids:
+        cache_path(transaction_id).unlink(missing_ok=True)
+
+
+def invalidate_student_receipts(student_ids, since=None):
+    """
+    Drops the cached receipts of these students' transactions (only those dated
+    at or after since, if given).
+    """
+    transactions = Transaction.objects.filter(student_id__in=student_ids)
+    if since is not None:
+        transactions = transactions.filter(date__gte=since)
+    invalidate_receipts(transactions.values_list('id', flat=True))
+
+
+def invalidate_receipts_from(transaction, previous=None):
+    """
+    A change to a transaction changes its own receipt and the printed balance
+    of the student's receipts dated at or after it. previous is the row as it
+    was before an edit: if the edit moved it to another student or date, both
+    students' receipts change from the earlier of the two dates.
+    """
+    student_ids, since = {transaction.student_id}, transaction.date
+    if previous is not None:
+        student_ids.add(previous.student_id)
+        since = min(since, previous.date)
+    invalidate_receipts([transaction.id])
+    invalidate_student_receipts(student_ids, since)
@@ -0,0 +1,113 @@
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from apps.core.utils import invalidate_home_stats
+from apps.students.models import Student
+from apps.students.enrollment import class_members, snapshot_enrollments
+from .models import Transaction, DailyCollectionSummary
+
+# SQLite caps the number of bound parameters per statement, so large
+# id lists are split into chunks of this size.
+CHUNK_SIZE = 500
+
+
+def invoice_reference(fee, student_id):
+    """
+    The unique reference number used for a Fee invoice.
+    Format: INV-{term}-{student}-{fee}
+    """
+    return f"INV-{fee.term.name}-{student_id}-{fee.id}"
+
+
+def invoice_fee_structures(fees):
+    """
+    Invoices every student enrolled in the class of each given FeeStructure
+    during the fee's term (so an old term's fee still bills the students who
+    were in that class then, not the class's current members). A term that has
+    not been current yet has no enrollments, so its fees bill the class's
+    current members. Raises ValueError (and bills nothing) if a fee belongs to
+    a past term without enrollments (see enrollment.class_members).
+
+    Works on the whole set at once instead of student by student:
+    1. One or two queries load the class members, one the (student, fee) pairs already billed.
+    2. The missing invoices are inserted with bulk_create.
+    3. Each affected student's current_balance is adjusted once.
+    4. The daily collection rollup is bumped once per class.
+
+    Returns the number of invoices created.
+    """
+    fees = list(fees)
+    if not fees:
+        return 0
+
+    class_ids = {fee.student_class_id for fee in fees}
+    term_ids = {fee.term_id for fee in fees}
+
+    with transaction.atomic():
+        # Pick up students admitted since the current term's snapshot
+        for term in {fee.term for fee in fees if fee.term.is_current}:
+            snapshot_enrollments(term)
+
+        # Students per (term, class)
+        students_by_class = class_members(term_ids, class_ids)
+
+        # Already billed (student, fee) pairs (one query on the fee_structure index)
+        already_billed = set(
+            Transaction.objects.filter(
+                fee_structure__in=fees
+            ).values_list('student_id', 'fee_structure_id')
+        )
+
+        now = timezone.now()
+        posted_on = Transaction.local_posting_date(now)
+        new_invoices = []
+        balance_deltas = defaultdict(int)
+        class_totals = defaultdict(lambda: (0, 0))
+        for fee in fees:
+            for student_id in students_by_class.get((fee.term_id, fee.student_class_id), []):
+                if (student_id, fee.id) in already_billed:
+                    continue
+                already_billed.add((student_id, fee.id))
+                new_invoices.append(Transaction(
+                    student_id=student_id,
+                    transaction_type=Transaction.TransactionType.INVOICE,
+                    amount=fee.amount,
+                    description=fee.description,
+                    reference_number=invoice_reference(fee, student_id),
+                    fee_structure=fee,
+                    student_class_id=fee.student_class_id,
+                    date=now,
+                    posted_on=posted_on,
+                ))
+                balance_deltas[student_id] += fee.amount
+                amount, count = class_totals[fee.student_class_id]
+                class_totals[fee.student_class_id] = (amount + fee.amount, count + 1)
+
+        if not new_invoices:
+            return 0
+
+        # bulk_create skips Transaction.save(), so balances are adjusted below
+        Transaction.objects.bulk_create(new_invoices, batch_size=CHUNK_SIZE)
+
+        # Students in the same class usually share the same delta, so group by it
+        # to issue one UPDATE per distinct amount instead of one per student.
+        students_by_delta = defaultdict(list)
+        for student_id, delta in balance_deltas.items():
+            students_by_delta[delta].append(student_id)
+
+        for delta, student_ids in students_by_delta.items():
+            for i in range(0, len(student_ids), CHUNK_SIZE):
+                Student.objects.filter(id__in=student_ids[i:i + CHUNK_SIZE]).update(
+                    current_balance=F('current_balance') + delta
+                )
+
+        # Daily collection rollup: one bucket per class
+        for class_id, (amount, count) in class_totals.items():
+            DailyCollectionSummary.record(
+                posted_on, Transaction.TransactionType.INVOICE, class_id, amount, count
+            )
+
+    # bulk_create sends no post_save signals
+    invalidate_home_stats()
+    return len(new_invoices)
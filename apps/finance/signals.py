@@ -0,0 +1,65 @@
+import copy
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from apps.students.models import Student
+from .models import Transaction, DailyCollectionSummary
+from .receipts import invalidate_receipts_from, invalidate_student_receipts
+
+# Student fields printed on receipts
+RECEIPT_FIELDS = ('first_name', 'last_name', 'admission_number')
+
+@receiver(post_delete, sender=Transaction)
+def reverse_balance_on_delete(sender, instance, **kwargs):
+    """
+    Reverses a deleted transaction's effect on the student's balance
+    and on the daily collection rollup.
+    Runs for single deletes as well as queryset and cascade deletes.
+    """
+    Transaction.apply_balance_delta(instance.student_id, -instance.signed_amount)
+    DailyCollectionSummary.record(
+        instance.posted_on, instance.transaction_type, instance.student_class_id, -instance.amount, -1
+    )
+
+@receiver(post_save, sender=Transaction)
+def invalidate_cached_receipts(sender, instance, **kwargs):
+    """
+    Drops cached receipt PDFs whose content depends on this transaction, as it
+    is now and as it was before the save (see Transaction.save), once the
+    change commits: a receipt rendered from the old rows before then would
+    otherwise be cached again and outlive the change.
+    """
+    changed, previous = copy.copy(instance), getattr(instance, '_previous', None)
+    transaction.on_commit(lambda: invalidate_receipts_from(changed, previous))
+
+@receiver(post_delete, sender=Transaction)
+def invalidate_deleted_receipts(sender, instance, **kwargs):
+    """
+    Same as invalidate_cached_receipts for a deleted transaction. Works on a
+    copy, as Django clears a deleted instance's pk after the signal.
+    """
+    deleted = copy.copy(instance)
+    transaction.on_commit(lambda: invalidate_receipts_from(deleted))
+
+@receiver(pre_save, sender=Student)
+def note_receipt_fields(sender, instance, update_fields=None, **kwargs):
+    """
+    Notes whether a save renames the student (or changes the admission number),
+    for student_renamed. Balance-only saves skip the lookup.
+    """
+    instance._receipt_fields_changed = False
+    if instance.pk is None or (update_fields is not None and not set(RECEIPT_FIELDS) & set(update_fields)):
+        return
+    stored = Student.objects.filter(pk=instance.pk).values_list(*RECEIPT_FIELDS).first()
+    instance._receipt_fields_changed = (
+        stored is not None and stored != tuple(getattr(instance, name) for name in RECEIPT_FIELDS)
+    )
+
+@receiver(post_save, sender=Student)
+def student_renamed(sender, instance, created, **kwargs):
+    """
+    Every receipt prints the student's name and admission number: drop the
+    student's cached receipts once a change to them commits.
+    """
+    if not created and getattr(instance, '_receipt_fields_changed', False):
+        transaction.on_commit(lambda: invalidate_student_receipts([instance.id]))
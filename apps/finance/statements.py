@@ -0,0 +1,180 @@
+"""
+Fee statements: opening balance, the period's transactions with a running
+balance, and the closing balance, for one student or a whole class.
+
+A batch costs a constant number of queries whatever its size: the students
+are loaded once and every statement comes out of a single window-function
+query over their ledgers (see ledger_rows). Rendered statements only use
+the loaded objects, so PDFs can be drawn in worker processes (see batch).
+
+Terms have no dates of their own; a term's period runs from the first posting
+of its fee invoices to the day before the next term's invoices (or today).
+"""
+import datetime
+from dataclasses import dataclass, field
+from decimal import Decimal
+from django.db.models import Case, F, Min, OuterRef, Q, Subquery, Sum, Value, When, Window
+from django.db.models.functions import RowNumber
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from apps.students.enrollment import current_term
+from apps.students.models import Enrollment, Student
+from .ledger import CENTS, MONEY, signed_amount
+from .models import Transaction
+from .pdf import get_pdf_backend
+
+STATEMENT_TEMPLATE = 'finance/pdf/statement.html'
+
+
+@dataclass
+class Statement:
+    student: object
+    start_date: datetime.date
+    end_date: datetime.date
+    term: object = None
+    class_name: str = ''  # the student's class during the term (or now, without one)
+    opening_balance: Decimal = Decimal('0.00')
+    lines: list = field(default_factory=list)  # Transactions with a running_balance attribute
+
+    @property
+    def closing_balance(self):
+        return self.lines[-1].running_balance if self.lines else self.opening_balance
+
+    @property
+    def credit_balance(self):
+        """The closing balance as a positive amount when the student is in credit."""
+        return -self.closing_balance
+
+    @property
+    def total_charges(self):
+        return sum((t.amount for t in self.lines if t.transaction_type not in Transaction.CREDIT_TYPES), Decimal('0.00'))
+
+    @property
+    def total_credits(self):
+        return sum((t.amount for t in self.lines if t.transaction_type in Transaction.CREDIT_TYPES), Decimal('0.00'))
+
+    @property
+    def filename(self):
+        return get_valid_filename(f"Statement_{self.student.admission_number}_{self.start_date:%Y%m%d}-{self.end_date:%Y%m%d}.pdf")
+
+
+def term_period(term):
+    """
+    (first day, last day) of a term, from its invoices' posting dates: it ends
+    the day before the first invoice of a later term, so invoices posted late
+    for an earlier term do not cut this one short. Terms are ordered as by
+    Term.sort_key: session name, then term name, compared as strings. This
+    assumes names that sort in calendar order ("2024/2025", "Term 1" to
+    "Term 3"); a "Term 10" would come before "Term 2".
+    Returns None if nothing has been invoiced for the term yet.
+    """
+    start = Transaction.objects.filter(fee_structure__term=term).aggregate(start=Min('posted_on'))['start']
+    if start is None:
+        return None
+    later_terms = Q(fee_structure__term__session__name__gt=term.session.name) | Q(
+        fee_structure__term__session_id=term.session_id, fee_structure__term__name__gt=term.name
+    )
+    next_start = Transaction.objects.filter(
+        later_terms, posted_on__gt=start
+    ).aggregate(start=Min('posted_on'))['start']
+    end = next_start - datetime.timedelta(days=1) if next_start else timezone.localdate()
+    return start, end
+
+
+def ledger_rows(student_ids, start_date, end_date):
+    """
+    One query for every student's statement lines: the transactions posted in
+    the period, each with its running balance and the student's opening
+    balance, plus each student's last earlier transaction when the period has
+    none (it only carries the opening balance).
+    """
+    ordered = [F('date').asc(), F('id').asc()]
+    return Transaction.objects.filter(student_id__in=student_ids, posted_on__lte=end_date).annotate(
+        running_balance=Window(Sum(signed_amount()), partition_by=[F('student_id')], order_by=ordered),
+        opening_balance=Window(Sum(Case(
+            When(posted_on__lt=start_date, then=signed_amount()),
+            default=Value(0), output_field=MONEY,
+        )), partition_by=[F('student_id')]),
+        latest=Window(RowNumber(), partition_by=[F('student_id')], order_by=[F('date').desc(), F('id').desc()]),
+    ).filter(Q(posted_on__gte=start_date) | Q(latest=1)).order_by('student_id', 'date', 'id')
+
+
+def build_statements(students, start_date, end_date, term=None):
+    """
+    Statements for the given students (a queryset) over [start_date, end_date],
+    in the queryset's order: two queries in total (three for a past term).
+    A term statement shows the class the student was enrolled in that term;
+    without an enrollment, the current class for the current or a later term
+    (not enrolled yet) and none for a past one.
+    """
+    students = students.select_related('current_class')
+    if term is not None:
+        students = students.annotate(term_class_name=Subquery(
+            Enrollment.objects.filter(student=OuterRef('pk'), term=term).values('student_class__name')[:1]
+        ))
+    students = list(students)
+    current_classes = term is None or term_has_begun(term, students)
+    statements = {}
+    for student in students:
+        class_name = getattr(student, 'term_class_name', None)
+        if class_name is None and current_classes and student.current_class:
+            class_name = student.current_class.name
+        statements[student.id] = Statement(
+            student=student, start_date=start_date, end_date=end_date, term=term, class_name=class_name or '',
+        )
+    if not statements:
+        return []
+
+    for row in ledger_rows(list(statements), start_date, end_date):
+        statement = statements[row.student_id]
+        # SQLite sums decimals as floats; round them back to cents
+        statement.opening_balance = Decimal(row.opening_balance).quantize(CENTS)
+        if row.posted_on >= start_date:
+            row.running_balance = Decimal(row.running_balance).quantize(CENTS)
+            statement.lines.append(row)
+    return [statements[student.id] for student in students]
+
+
+def term_has_begun(term, students):
+    """
+    Whether term is the current term or a later one, i.e. its unenrolled
+    students are in their current classes. Only queried when one of the
+    students has no enrollment in the term.
+    """
+    if all(student.term_class_name is not None for student in students):
+        return True
+    current = current_term()
+    return current is None or term.sort_key >= current.sort_key
+
+
+def class_students(class_id, term=None):
+    """A class's students: those enrolled in it for the term, or its current members."""
+    if term is not None:
+        students = Student.objects.filter(
+            id__in=Enrollment.objects.filter(term=term, student_class_id=class_id).values('student_id')
+        )
+    else:
+        students = Student.objects.filter(current_class_id=class_id)
+    return students.order_by('last_name', 'first_name', 'id')
+
+
+def render_statements_html(statements):
+    return render_to_string(STATEMENT_TEMPLATE, {'statements': statements, 'today': timezone.localdate()})
+
+
+def render_statements_pdf(statements):
+    """One PDF with a page per statement. Returns the bytes, or None if rendering failed."""
+    return get_pdf_backend().render_template(
+        STATEMENT_TEMPLATE, {'statements': statements, 'today': timezone.localdate()}
+    )
+
+
+def statement_entry(statement):
+    """Renders one statement (in a worker process, without queries). Returns (filename, pdf bytes)."""
+    return statement.filename, render_statements_pdf([statement])
+
+
+def statement_label(statement):
+    """How a statement that could not be rendered is listed in FAILED.txt."""
+    return statement.filename
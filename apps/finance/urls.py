@@ -13,6 +13,9 @@ urlpatterns = [
     # Receipts & Reports
     path('receipt/<int:transaction_id>/', views.transaction_receipt, name='transaction_receipt'),
     path('receipt/<int:transaction_id>/pdf/', views.download_receipt, name='download_receipt'),
+    path('receipts/batch/', views.download_receipts_batch, name='download_receipts_batch'),
+    path('statements/student/<int:student_id>/', views.student_statement, name='student_statement'),
+    path('statements/class/<int:class_id>/', views.class_statements, name='class_statements'),
     path('reports/', views.reports_dashboard, name='reports'),
     path('reports/defaulters/', views.defaulters_list, name='defaulters_list'),
     path('reports/daily-collection/', views.daily_collection, name='daily_collection'),
@@ -1,13 +1,8 @@
-from io import BytesIO
 from django.http import HttpResponse
-from django.template.loader import get_template
-from xhtml2pdf import pisa
+from .pdf import get_pdf_backend
 
 def render_to_pdf(template_src, context_dict={}):
-    template = get_template(template_src)
-    html  = template.render(context_dict)
-    result = BytesIO()
-    pdf = pisa.pisaDocument(BytesIO(html.encode("ISO-8859-1")), result)
-    if not pdf.err:
-        return HttpResponse(result.getvalue(), content_type='application/pdf')
+    content = get_pdf_backend().render_template(template_src, context_dict)
+    if content is not None:
+        return HttpResponse(content, content_type='application/pdf')
     return None
@@ -2,15 +2,23 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.utils import timezone
-from django.db.models import Sum, Q
+from django.db.models import Sum, Q, Count, OuterRef, Subquery, Exists, Case, When
+from django.db.models.functions import Coalesce
 import datetime
-from .models import FeeStructure, Transaction
+from .models import FeeStructure, Transaction, DailyCollectionSummary
 from .forms import FeeStructureForm, FeeStructureCreateForm, PaymentForm
-from .utils import render_to_pdf
-from django.http import HttpResponse
+from .services import invoice_fee_structures
+from .receipts import open_receipt
+from .batch import select_receipts, receipt_entry, receipt_label, render_documents, stream_zip
+from .statements import (
+    build_statements, class_students, render_statements_html, render_statements_pdf, statement_entry, statement_label,
+    term_period,
+)
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
+from django.conf import settings
 
 from django.db import transaction, models
-from apps.students.models import Student
+from apps.students.models import Student, Enrollment
 from apps.core.models import StudentClass
 
 def is_admin(user):
@@ -21,26 +29,37 @@ def fee_structure_list(request):
     """
     Displays the list of defined fees with invoicing status.
     """
-    fees = FeeStructure.objects.select_related('term', 'student_class').all().order_by('-term', 'student_class')
+    # One grouped query: invoice counts come from the fee_structure FK,
+    # class sizes from a correlated subquery on the term's enrollments, or on
+    # the class's current members for a term not yet enrolled (as invoicing does).
+    class_size = Enrollment.objects.filter(
+        term=OuterRef('term'), student_class=OuterRef('student_class')
+    ).values('term').annotate(total=Count('id')).values('total')
+    current_size = Student.objects.filter(
+        status=Student.Status.ACTIVE, current_class=OuterRef('student_class')
+    ).values('current_class').annotate(total=Count('id')).values('total')
+    term_enrolled = Exists(Enrollment.objects.filter(term=OuterRef('term')))
     
-    fees_data = []
-    for fee in fees:
-        total_students = Student.objects.filter(current_class=fee.student_class).count()
-        # Count transactions for this specific fee using the unique ID suffix pattern
-        invoices = Transaction.objects.filter(
-            transaction_type=Transaction.TransactionType.INVOICE,
-            reference_number__endswith=f"-{fee.id}"
-        )
-        invoiced_count = invoices.count()
-        viewed_count = invoices.filter(is_viewed=True).count()
-        
-        fees_data.append({
+    invoice_filter = Q(invoices__transaction_type=Transaction.TransactionType.INVOICE)
+    fees = FeeStructure.objects.select_related('term', 'student_class').annotate(
+        total_students=Case(
+            When(term_enrolled, then=Coalesce(Subquery(class_size), 0)),
+            default=Coalesce(Subquery(current_size), 0),
+        ),
+        invoiced_count=Count('invoices', filter=invoice_filter),
+        viewed_count=Count('invoices', filter=invoice_filter & Q(invoices__is_viewed=True)),
+    ).order_by('-term', 'student_class')
+    
+    fees_data = [
+        {
             'fee': fee,
-            'total_students': total_students,
-            'invoiced_count': invoiced_count,
-            'pending_count': total_students - invoiced_count,
-            'viewed_count': viewed_count
-        })
+            'total_students': fee.total_students,
+            'invoiced_count': fee.invoiced_count,
+            'pending_count': fee.total_students - fee.invoiced_count,
+            'viewed_count': fee.viewed_count
+        }
+        for fee in fees
+    ]
         
     return render(request, 'finance/fee_structure_list.html', {'fees_data': fees_data})
 
@@ -98,35 +117,18 @@ def fee_structure_update(request, fee_id):
 @login_required
 def apply_fee_structure(request, fee_id):
     """
-    Invoices all students in the class for this specific Fee.
+    Invoices all students enrolled in the class for this Fee's term.
     """
-    fee = get_object_or_404(FeeStructure, id=fee_id)
+    fee = get_object_or_404(FeeStructure.objects.select_related('term'), id=fee_id)
     
-    # Get all students in this class
-    students = Student.objects.filter(current_class=fee.student_class)
-    
-    count = 0
-    with transaction.atomic():
-        for student in students:
-            # Check if this specific fee has already been billed to this student to avoid duplicates
-            # A more robust system might allow re-billing, but let's prevent accidental double clicks.
-            # Check using the EXACT reference number logic we intend to create
-            # This ensures distinct FeeStructures are treated separately even if they share descriptions
-            expected_ref = f"INV-{fee.term.name}-{student.id}-{fee.id}"
-            
-            exists = Transaction.objects.filter(
-                reference_number=expected_ref
-            ).exists()
-            
-            if not exists:
-                Transaction.objects.create(
-                    student=student,
-                    transaction_type=Transaction.TransactionType.INVOICE,
-                    amount=fee.amount,
-                    description=fee.description,
-                    reference_number=expected_ref
-                )
-                count += 1
+    # Invoice the whole class in one pass. Students who already have this
+    # specific fee (matched by its INV-{term}-{student}-{fee} reference) are skipped,
+    # which prevents accidental double clicks from billing twice.
+    try:
+        count = invoice_fee_structures([fee])
+    except ValueError as e:
+        messages.error(request, str(e))
+        return redirect('fee_structure_list')
     
     if count > 0:
         messages.success(request, f"Successfully invoiced {count} students for {fee.description}.")
@@ -155,12 +157,13 @@ def record_payment(request, student_id):
                 return render(request, 'finance/payment_form.html', {'form': form, 'student': student, 'title': 'Record Payment'})
 
             # Create the Payment Transaction
-            Transaction.objects.create(
+            reference = reference or f"PAY-{timezone.now().timestamp()}"
+            payment = Transaction.objects.create(
                 student=student,
                 transaction_type=Transaction.TransactionType.PAYMENT,
                 amount=amount,
                 description=description,
-                reference_number=reference or f"PAY-{timezone.now().timestamp()}"
+                reference_number=reference
             )
             
             # Audit Log
@@ -169,6 +172,8 @@ def record_payment(request, student_id):
             log_action(request, student, AuditLog.Action.PAYMENT, f"Received {amount} from Student via {description or 'Standard Payment'}")
             
             # Notifications (SMS & Email)
+            # These are only queued here; the outbox worker (manage.py process_notifications)
+            # sends them and renders the PDF receipt, so the payment desk never waits on them.
             from apps.notifications.services import NotificationService
             
             # 1. SMS
@@ -176,22 +181,18 @@ def record_payment(request, student_id):
                 msg = f"Receipt: {settings.SCHOOL_NAME} Received KES {amount} for {student.full_name}. Balance: KES {student.current_balance}. Ref: {reference}"
                 NotificationService.send_sms(student.parent_phone, msg)
                 
-            # 2. Email (with Receipt Attachment)
+            # 2. Email (with Receipt Attachment, rendered by the worker)
             if student.parent_email:
-                # Generate PDF in memory
-                transaction_obj = Transaction.objects.get(reference_number=reference)
-                pdf_content = render_to_pdf('finance/pdf/receipt.html', {'transaction': transaction_obj})
-                
-                attachment = None
-                if pdf_content:
-                    attachment = (f"Receipt_{reference}.pdf", pdf_content.content, 'application/pdf')
-
                 NotificationService.send_email(
                     recipient_email=student.parent_email,
                     subject=f"Payment Receipt - {reference}",
-                    template_name='finance/email/payment_receipt.html', # We need to create this simple template
+                    template_name='finance/email/payment_receipt.html',
                     context={'student': student, 'amount': amount, 'reference': reference},
-                    attachment=attachment
+                    attachment_spec={
+                        'type': 'receipt',
+                        'transaction_id': payment.id,
+                        'filename': f"Receipt_{reference}.pdf",
+                    }
                 )
             
             messages.success(request, f"Payment of KES {amount} recorded for {student.full_name}")
@@ -214,13 +215,10 @@ def reports_dashboard(request):
     """
     Overview of financial health.
     """
-    today = timezone.now().date()
+    today = timezone.localdate()
     
-    # 1. Daily Collection
-    today_payments = Transaction.objects.filter(
-        transaction_type=Transaction.TransactionType.PAYMENT,
-        date__date=today
-    ).aggregate(models.Sum('amount'))['amount__sum'] or 0
+    # 1. Daily Collection (from the rollup, not the ledger)
+    today_payments = DailyCollectionSummary.total(Transaction.TransactionType.PAYMENT, today, today)
     
     # 2. Total Arrears (Sum of positive balances)
     total_arrears = Student.objects.filter(current_balance__gt=0).aggregate(models.Sum('current_balance'))['current_balance__sum'] or 0
@@ -251,29 +249,13 @@ def bulk_invoice(request):
             messages.warning(request, "No fees selected for invoicing.")
             return redirect('fee_structure_list')
         
-        total_invoiced = 0
-        fees_processed = 0
-        
-        with transaction.atomic():
-            for fee_id in fee_ids:
-                fee = get_object_or_404(FeeStructure, id=fee_id)
-                students = Student.objects.filter(current_class=fee.student_class)
-                
-                for student in students:
-                    expected_ref = f"INV-{fee.term.name}-{student.id}-{fee.id}"
-                    exists = Transaction.objects.filter(reference_number=expected_ref).exists()
-                    
-                    if not exists:
-                        Transaction.objects.create(
-                            student=student,
-                            transaction_type=Transaction.TransactionType.INVOICE,
-                            amount=fee.amount,
-                            description=fee.description,
-                            reference_number=expected_ref
-                        )
-                        total_invoiced += 1
-                
-                fees_processed += 1
+        fees = FeeStructure.objects.select_related('term').filter(id__in=fee_ids)
+        fees_processed = len(fees)
+        try:
+            total_invoiced = invoice_fee_structures(fees)
+        except ValueError as e:
+            messages.error(request, str(e))
+            return redirect('fee_structure_list')
         
         if total_invoiced > 0:
             messages.success(request, f"Successfully processed {fees_processed} fees and invoiced {total_invoiced} students.")
@@ -316,53 +298,194 @@ def defaulters_list(request):
     }
     return render(request, 'finance/report_defaulters.html', context)
 
+def parse_date_param(value):
+    """
+    Parses a YYYY-MM-DD query parameter. Returns None if missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
 @login_required
 def daily_collection(request):
     """
-    Detailed report of payments received on a specific date.
+    Detailed report of payments received on a specific date,
+    or over a date range when 'from' and 'to' are given.
     """
-    date_str = request.GET.get('date')
-    if date_str:
-        try:
-            selected_date = datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
-        except ValueError:
-            selected_date = timezone.now().date()
+    today = timezone.localdate()
+    selected_date = parse_date_param(request.GET.get('date')) or today
+    start_date = parse_date_param(request.GET.get('from'))
+    end_date = parse_date_param(request.GET.get('to'))
+    
+    if start_date or end_date:
+        # Date range (an open end defaults to the other end, or today)
+        start_date = start_date or end_date
+        end_date = end_date or today
+        if start_date > end_date:
+            start_date, end_date = end_date, start_date
+        selected_date = start_date
     else:
-        selected_date = timezone.now().date()
+        start_date = end_date = selected_date
         
+    # posted_on is the indexed local date, so this is an index range scan
     transactions = Transaction.objects.filter(
         transaction_type=Transaction.TransactionType.PAYMENT,
-        date__date=selected_date
+        posted_on__range=(start_date, end_date)
     ).select_related('student', 'student__current_class').order_by('-date')
     
-    total_collected = transactions.aggregate(Sum('amount'))['amount__sum'] or 0
+    total_collected = DailyCollectionSummary.total(Transaction.TransactionType.PAYMENT, start_date, end_date)
     
     context = {
         'transactions': transactions,
         'selected_date': selected_date,
+        'start_date': start_date,
+        'end_date': end_date,
+        'is_range': start_date != end_date,
         'total_collected': total_collected,
-        'today': timezone.now().date(),
+        'today': today,
     }
     return render(request, 'finance/report_collection.html', context)
 
+@login_required
+@user_passes_test(is_admin)
+def download_receipts_batch(request):
+    """
+    Streams a ZIP of the receipts for a date (or from/to range), a class and/or a term.
+    """
+    start_date = parse_date_param(request.GET.get('date') or request.GET.get('from'))
+    end_date = parse_date_param(request.GET.get('date') or request.GET.get('to'))
+    class_id = request.GET.get('class_id')
+    term_id = request.GET.get('term_id')
+    class_id = int(class_id) if class_id and class_id.isdigit() else None
+    term_id = int(term_id) if term_id and term_id.isdigit() else None
+
+    if not (start_date or end_date or class_id or term_id):
+        messages.warning(request, "Choose a date, class or term to download receipts for.")
+        return redirect('daily_collection')
+
+    transaction_ids = list(select_receipts(start_date, end_date, class_id, term_id).values_list('id', flat=True))
+    if not transaction_ids:
+        messages.info(request, "No payments match that selection.")
+        return redirect('daily_collection')
+
+    from apps.audit.utils import log_action
+    from apps.audit.models import AuditLog
+    log_action(request, Transaction, AuditLog.Action.EXPORT, f"Downloaded {len(transaction_ids)} receipts as a ZIP")
+
+    response = StreamingHttpResponse(
+        stream_zip(render_documents(
+            receipt_entry, transaction_ids, workers=settings.PDF_EXPORT_WORKERS, describe=receipt_label
+        )),
+        content_type='application/zip',
+    )
+    response['Content-Disposition'] = f'attachment; filename="receipts_{timezone.localdate():%Y%m%d}.zip"'
+    return response
+
+def statement_period(request):
+    """
+    The statement period from ?term_id= or ?from=&to=, defaulting to the current term.
+    Returns (start_date, end_date, term); the dates are None if no period can be found.
+    """
+    from apps.core.models import Term
+    term_id = request.GET.get('term_id')
+    start_date = parse_date_param(request.GET.get('from'))
+    end_date = parse_date_param(request.GET.get('to'))
+
+    if not (start_date or end_date):
+        terms = Term.objects.select_related('session')
+        term = terms.filter(id=term_id).first() if term_id and term_id.isdigit() else terms.filter(is_current=True).first()
+        period = term_period(term) if term else None
+        if period:
+            return period[0], period[1], term
+        return None, None, term
+
+    start_date = start_date or end_date
+    end_date = end_date or timezone.localdate()
+    if start_date > end_date:
+        start_date, end_date = end_date, start_date
+    return start_date, end_date, None
+
+def statements_response(request, statements, filename):
+    """Renders statements as HTML (default), one PDF (?format=pdf) or a ZIP of PDFs (?format=zip)."""
+    output = request.GET.get('format')
+    if output in ('pdf', 'zip'):
+        from apps.audit.utils import log_action
+        from apps.audit.models import AuditLog
+        log_action(request, Student, AuditLog.Action.EXPORT, f"Downloaded {len(statements)} fee statement(s)")
+
+    if output == 'zip':
+        response = StreamingHttpResponse(
+            stream_zip(render_documents(
+                statement_entry, statements, workers=settings.PDF_EXPORT_WORKERS, describe=statement_label
+            )),
+            content_type='application/zip',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}.zip"'
+        return response
+
+    if output == 'pdf':
+        pdf = render_statements_pdf(statements)
+        if pdf is None:
+            return HttpResponse("Error Rendering PDF", status=400)
+        response = HttpResponse(pdf, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.pdf"'
+        return response
+
+    return HttpResponse(render_statements_html(statements))
+
+@login_required
+@user_passes_test(is_admin)
+def student_statement(request, student_id):
+    """
+    Fee statement for one student over a term or date range.
+    """
+    student = get_object_or_404(Student, id=student_id)
+    start_date, end_date, term = statement_period(request)
+    if start_date is None:
+        messages.warning(request, "Choose a date range: the term has no invoices yet.")
+        return redirect('student_detail', student_id=student.id)
+
+    statements = build_statements(Student.objects.filter(id=student.id), start_date, end_date, term)
+    return statements_response(request, statements, f"Statement_{student.admission_number}")
+
+@login_required
+@user_passes_test(is_admin)
+def class_statements(request, class_id):
+    """
+    Fee statements for a whole class (the students enrolled in it for the term,
+    or its current students for a date range), built with a fixed number of queries.
+    """
+    student_class = get_object_or_404(StudentClass, id=class_id)
+    start_date, end_date, term = statement_period(request)
+    if start_date is None:
+        messages.warning(request, "Choose a date range: the term has no invoices yet.")
+        return redirect('class_list')
+
+    statements = build_statements(class_students(student_class.id, term), start_date, end_date, term)
+    return statements_response(request, statements, f"Statements_{student_class.name}")
+
 @login_required
 def download_receipt(request, transaction_id):
     """
     Generates a PDF receipt for a transaction.
     """
-    transaction = get_object_or_404(Transaction, id=transaction_id)
+    transaction = get_object_or_404(
+        Transaction.objects.select_related('student', 'student_class'), id=transaction_id
+    )
     
     # Audit Log (Export action)
     from apps.audit.utils import log_action
     from apps.audit.models import AuditLog
     log_action(request, transaction, AuditLog.Action.EXPORT, f"Downloaded receipt PDF")
 
-    pdf = render_to_pdf('finance/pdf/receipt.html', {'transaction': transaction})
+    # Rendered once, then streamed from the on-disk receipt cache
+    pdf = open_receipt(transaction)
     
     if pdf:
-        response = HttpResponse(pdf, content_type='application/pdf')
         filename = f"Receipt_{transaction.reference_number}.pdf"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        return response
+        return FileResponse(pdf, as_attachment=True, filename=filename, content_type='application/pdf')
         
     return HttpResponse("Error Rendering PDF", status=400)
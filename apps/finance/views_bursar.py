@@ -1,9 +1,8 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from apps.users.decorators import bursar_required
-from apps.finance.models import Transaction
+from apps.finance.models import Transaction, DailyCollectionSummary
 from apps.students.models import Student
-from django.db.models import Sum
 from django.utils import timezone
 
 @login_required
@@ -13,13 +12,10 @@ def bursar_dashboard(request):
     Simplified dashboard for Bursars.
     Focuses on daily collection and quick actions.
     """
-    today = timezone.now().date()
+    today = timezone.localdate()
     
-    # 1. Daily Collection
-    today_payments = Transaction.objects.filter(
-        transaction_type=Transaction.TransactionType.PAYMENT,
-        date__date=today
-    ).aggregate(Sum('amount'))['amount__sum'] or 0
+    # 1. Daily Collection (from the rollup, not the ledger)
+    today_payments = DailyCollectionSummary.total(Transaction.TransactionType.PAYMENT, today, today)
     
     # 2. Recent Transactions (Last 10)
     recent_transactions = Transaction.objects.filter(
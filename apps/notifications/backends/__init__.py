@@ -0,0 +1,10 @@
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+def get_sms_backend(backend=None, fail_silently=False, **kwargs):
+    """
+    Loads an SMS backend, like django.core.mail.get_connection() does for email.
+    Defaults to settings.SMS_BACKEND.
+    """
+    klass = import_string(backend or getattr(settings, 'SMS_BACKEND', 'apps.notifications.backends.console.SMSBackend'))
+    return klass(fail_silently=fail_silently, **kwargs)
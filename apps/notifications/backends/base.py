@@ -0,0 +1,50 @@
+class SMSMessage:
+    """
+    A single text message. Backends set sent (or error) on each message they
+    handle, so a caller can tell which ones went out when a batch fails partway.
+    """
+    def __init__(self, to, body):
+        self.to = to
+        self.body = body
+        self.sent = False
+        self.error = None
+
+    def __repr__(self):
+        return f"SMSMessage(to={self.to!r})"
+
+
+class BaseSMSBackend:
+    """
+    Base class for SMS backends. Mirrors Django's email backend interface:
+    open() acquires any connection, close() releases it, and send_messages()
+    sends a list of SMSMessage and returns how many were sent.
+
+    send_messages() must also mark every message it delivers with sent = True,
+    and every one it rejects with an error, before returning or raising:
+    messages left unmarked are treated as not sent and retried.
+
+    Use it as a context manager to reuse one connection for a whole batch.
+    """
+    def __init__(self, fail_silently=False, **kwargs):
+        self.fail_silently = fail_silently
+
+    def open(self):
+        """Opens a connection. Returns True if a new one was opened."""
+        return False
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        try:
+            self.open()
+        except Exception:
+            self.close()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def send_messages(self, messages):
+        raise NotImplementedError('subclasses of BaseSMSBackend must override send_messages()')
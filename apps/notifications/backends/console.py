@@ -0,0 +1,36 @@
+import sys
+import threading
+from .base import BaseSMSBackend
+
+
+class SMSBackend(BaseSMSBackend):
+    """
+    Writes messages to stdout (development default).
+    """
+    def __init__(self, *args, stream=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stream = stream or sys.stdout
+        self._lock = threading.RLock()
+
+    def write_message(self, message):
+        self.stream.write(f"\n[SMS SENT] To: {message.to}\nMessage: {message.body}\n\n")
+
+    def send_messages(self, messages):
+        if not messages:
+            return 0
+        sent = 0
+        with self._lock:
+            try:
+                for message in messages:
+                    try:
+                        self.write_message(message)
+                    except Exception as e:
+                        message.error = str(e) or e.__class__.__name__
+                        raise
+                    message.sent = True
+                    sent += 1
+                self.stream.flush()
+            except Exception:
+                if not self.fail_silently:
+                    raise
+        return sent
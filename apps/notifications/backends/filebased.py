@@ -0,0 +1,47 @@
+import os
+import datetime
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from .console import SMSBackend as ConsoleSMSBackend
+
+
+class SMSBackend(ConsoleSMSBackend):
+    """
+    Appends messages to a log file (one per backend instance) under settings.SMS_FILE_PATH.
+    Useful for testing bulk sends without flooding the console.
+    """
+    def __init__(self, *args, file_path=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.file_path = str(file_path or getattr(settings, 'SMS_FILE_PATH', '') or '')
+        if not self.file_path:
+            raise ImproperlyConfigured('SMS_FILE_PATH must be set to use the file SMS backend')
+        os.makedirs(self.file_path, exist_ok=True)
+        self.stream = None
+        self._fname = None
+
+    def _get_filename(self):
+        if self._fname is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+            self._fname = os.path.join(self.file_path, f"{timestamp}-{abs(id(self))}.log")
+        return self._fname
+
+    def open(self):
+        if self.stream is None:
+            self.stream = open(self._get_filename(), 'a', encoding='utf-8')
+            return True
+        return False
+
+    def close(self):
+        try:
+            if self.stream is not None:
+                self.stream.close()
+        finally:
+            self.stream = None
+
+    def send_messages(self, messages):
+        new_stream = self.open()
+        try:
+            return super().send_messages(messages)
+        finally:
+            if new_stream:
+                self.close()
@@ -0,0 +1,89 @@
+import json
+import http.client
+from urllib.parse import urlsplit
+from django.conf import settings
+from .base import BaseSMSBackend
+
+
+class SMSBackend(BaseSMSBackend):
+    """
+    POSTs messages as JSON to settings.SMS_HTTP_URL over one keep-alive connection.
+    A whole send_messages() batch goes in a single request:
+        {"messages": [{"to": "...", "body": "..."}, ...]}
+
+    A 2xx response means the whole batch was accepted, unless its JSON body lists
+    a result per message, in order, rejecting some of them:
+        {"results": [{"accepted": true}, {"accepted": false, "error": "..."}, ...]}
+
+    Point it at 'manage.py run_sms_stub' for local load testing, or at a gateway
+    adapter that accepts the same payload.
+    """
+    def __init__(self, *args, url=None, timeout=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.url = url or getattr(settings, 'SMS_HTTP_URL', 'http://127.0.0.1:8025/sms')
+        self.timeout = timeout or getattr(settings, 'SMS_HTTP_TIMEOUT', 10)
+        self.connection = None
+
+    def open(self):
+        if self.connection is not None:
+            return False
+        parts = urlsplit(self.url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(parts.hostname, parts.port, timeout=self.timeout)
+        return True
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            finally:
+                self.connection = None
+
+    def send_messages(self, messages):
+        if not messages:
+            return 0
+        new_connection = self.open()
+        try:
+            # bytes, so http.client sends headers and body in one packet
+            payload = json.dumps({'messages': [{'to': m.to, 'body': m.body} for m in messages]}).encode('utf-8')
+            self.connection.request(
+                'POST', urlsplit(self.url).path or '/', body=payload,
+                headers={'Content-Type': 'application/json'},
+            )
+            response = self.connection.getresponse()
+            body = response.read()  # drain so the connection can be reused
+            if response.status >= 300:
+                raise RuntimeError(f"SMS gateway returned HTTP {response.status}")
+            return self.mark_results(messages, body)
+        except Exception:
+            # A broken keep-alive connection must not be reused
+            self.close()
+            if not self.fail_silently:
+                raise
+            return 0
+        finally:
+            if new_connection:
+                self.close()
+
+    @staticmethod
+    def mark_results(messages, body):
+        """
+        Marks each message sent or rejected from the gateway's response body.
+        Returns how many were sent.
+        """
+        try:
+            results = json.loads(body)['results']
+        except (ValueError, KeyError, TypeError):
+            results = None
+        if (not isinstance(results, list) or len(results) != len(messages)
+                or not all(isinstance(result, dict) for result in results)):
+            results = [{'accepted': True}] * len(messages)
+
+        sent = 0
+        for message, result in zip(messages, results):
+            if result.get('accepted'):
+                message.sent = True
+                sent += 1
+            else:
+                message.error = result.get('error') or 'Rejected by the SMS gateway'
+        return sent
@@ -0,0 +1,15 @@
+from .base import BaseSMSBackend
+
+# Messages sent with this backend, like django.core.mail.outbox for email
+outbox = []
+
+
+class SMSBackend(BaseSMSBackend):
+    """
+    Keeps messages in the module-level 'outbox' list. For tests.
+    """
+    def send_messages(self, messages):
+        for message in messages:
+            message.sent = True
+        outbox.extend(messages)
+        return len(messages)
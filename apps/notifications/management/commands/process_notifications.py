@@ -0,0 +1,40 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.notifications import outbox
+
+
+class Command(BaseCommand):
+    help = "Runs the notification outbox worker: sends PENDING SMS and emails with retries and backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Sender threads (default: 4)")
+        parser.add_argument('--batch-size', type=int, default=50, help="Messages claimed per batch (default: 50)")
+        parser.add_argument('--max-attempts', type=int, default=outbox.MAX_ATTEMPTS,
+                            help=f"Attempts before a message is marked FAILED (default: {outbox.MAX_ATTEMPTS})")
+        parser.add_argument('--backoff', type=int, default=outbox.BACKOFF_SECONDS,
+                            help=f"Base retry delay in seconds, doubled per attempt (default: {outbox.BACKOFF_SECONDS})")
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help="Seconds to sleep when the queue is empty (default: 2)")
+        parser.add_argument('--once', action='store_true', help="Drain the due messages and exit")
+
+    def handle(self, *args, **options):
+        poll_interval = options['poll_interval']
+        batches = outbox.run_worker(
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            max_attempts=options['max_attempts'],
+            backoff=options['backoff'],
+            once=options['once'],
+            idle=lambda: time.sleep(poll_interval),
+        )
+
+        total_sent = total_failed = 0
+        try:
+            for sent, failed in batches:
+                total_sent += sent
+                total_failed += failed
+                self.stdout.write(f"Batch done: {sent} sent, {failed} failed")
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping worker...")
+
+        self.stdout.write(self.style.SUCCESS(f"Outbox worker finished. {total_sent} sent, {total_failed} failed."))
@@ -0,0 +1,58 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Runs a local HTTP stub that accepts SMS batches from the http SMS backend (for testing)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8025)
+        parser.add_argument('--quiet', action='store_true', help="Only print batch sizes, not message bodies")
+
+    def handle(self, *args, **options):
+        command = self
+        quiet = options['quiet']
+        totals = {'messages': 0}
+
+        class StubHandler(BaseHTTPRequestHandler):
+            # Keep-alive, so the backend can reuse one connection per batch
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    messages = json.loads(self.rfile.read(length))['messages']
+                except (ValueError, KeyError):
+                    self.send_response(400)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                totals['messages'] += len(messages)
+                command.stdout.write(f"Received {len(messages)} SMS (total {totals['messages']})")
+                if not quiet:
+                    for message in messages:
+                        command.stdout.write(f"  To: {message['to']} | {message['body']}")
+
+                body = json.dumps({
+                    'accepted': len(messages), 'results': [{'accepted': True}] * len(messages),
+                }).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((options['host'], options['port']), StubHandler)
+        self.stdout.write(f"SMS stub listening on http://{options['host']}:{options['port']}/sms (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
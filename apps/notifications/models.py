@@ -8,6 +8,7 @@ class NotificationLog(models.Model):
 
     class Status(models.TextChoices):
         PENDING = 'PENDING', 'Pending'
+        SENDING = 'SENDING', 'Sending'
         SENT = 'SENT', 'Sent'
         FAILED = 'FAILED', 'Failed'
 
@@ -19,8 +20,25 @@ class NotificationLog(models.Model):
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     error_message = models.TextField(null=True, blank=True)
     
+    # Something to attach when the message is actually sent, e.g.
+    # {"type": "receipt", "transaction_id": 12, "filename": "Receipt_X.pdf"}.
+    # Built by the worker so expensive work (PDF rendering) stays off the request.
+    attachment_spec = models.JSONField(null=True, blank=True)
+
+    # Outbox bookkeeping (see the process_notifications command)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True, help_text="Not retried before this time")
+    claimed_by = models.CharField(max_length=64, null=True, blank=True, help_text="Worker token holding this message")
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     sent_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # The worker polls for due PENDING rows and reclaims stale SENDING rows
+            models.Index(fields=['status', 'next_attempt_at'], name='notif_status_due_idx'),
+        ]
+
     def __str__(self):
         return f"{self.message_type} to {self.recipient} - {self.status}"
@@ -0,0 +1,165 @@
+import uuid
+import datetime
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.core.mail import get_connection
+from django.db import connection
+from django.db.models import Q, Subquery
+from django.utils import timezone
+from .models import NotificationLog
+from .services import NotificationService
+from .backends import get_sms_backend
+from .backends.base import SMSMessage
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the worker (overridable from the process_notifications command)
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 30        # 30s, 60s, 120s, ... between retries
+MAX_BACKOFF_SECONDS = 3600
+LEASE_SECONDS = 300         # a SENDING row older than this is assumed orphaned
+
+
+def release_stale_claims(lease_seconds=LEASE_SECONDS):
+    """
+    Puts messages back in the queue when the worker holding them died mid-batch.
+    """
+    cutoff = timezone.now() - datetime.timedelta(seconds=lease_seconds)
+    return NotificationLog.objects.filter(
+        status=NotificationLog.Status.SENDING, claimed_at__lt=cutoff
+    ).update(status=NotificationLog.Status.PENDING, claimed_by=None, claimed_at=None)
+
+
+def claim_batch(batch_size):
+    """
+    Claims up to batch_size due PENDING messages for this worker.
+    The claim is a single UPDATE, so concurrent workers never get the same row.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    due = NotificationLog.objects.filter(
+        Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now),
+        status=NotificationLog.Status.PENDING,
+    ).order_by('id').values('id')[:batch_size]
+
+    claimed = NotificationLog.objects.filter(
+        id__in=Subquery(due), status=NotificationLog.Status.PENDING
+    ).update(status=NotificationLog.Status.SENDING, claimed_by=token, claimed_at=now)
+
+    if not claimed:
+        return []
+    return list(NotificationLog.objects.filter(claimed_by=token, status=NotificationLog.Status.SENDING))
+
+
+def deliver_chunk(logs):
+    """
+    Sends a chunk of messages on one pool thread, reusing a single SMS backend
+    and a single email connection for the whole chunk. All SMS in the chunk go
+    to the backend in one send_messages() call, which reports on each message.
+    Returns {log id: None on success or the error text}.
+    """
+    results = {}
+    sms_logs = [log for log in logs if log.message_type == NotificationLog.Type.SMS]
+    email_logs = [log for log in logs if log.message_type != NotificationLog.Type.SMS]
+    try:
+        if sms_logs:
+            messages = [SMSMessage(log.recipient, log.body) for log in sms_logs]
+            batch_error = 'Not sent by the SMS backend'
+            try:
+                with get_sms_backend() as sms_backend:
+                    sms_backend.send_messages(messages)
+            except Exception as e:
+                logger.error(f"Error sending SMS batch of {len(sms_logs)}: {e}")
+                batch_error = str(e) or e.__class__.__name__
+            # Only messages the backend did not deliver are retried, even when the
+            # batch failed partway: the rest have reached the recipient already
+            for log, message in zip(sms_logs, messages):
+                results[log.id] = None if message.sent else (message.error or batch_error)
+
+        if email_logs:
+            try:
+                with get_connection() as email_connection:
+                    for log in email_logs:
+                        try:
+                            NotificationService.deliver(log, email_connection=email_connection)
+                            results[log.id] = None
+                        except Exception as e:
+                            logger.error(f"Error sending EMAIL to {log.recipient}: {e}")
+                            results[log.id] = str(e) or e.__class__.__name__
+            except Exception as e:
+                # Could not open (or close) the connection
+                logger.error(f"Error opening email connection: {e}")
+                for log in email_logs:
+                    results.setdefault(log.id, str(e) or e.__class__.__name__)
+    finally:
+        # Each pool thread has its own DB connection (used by attachment builders)
+        connection.close()
+    return results
+
+
+def backoff_delay(attempts, base=BACKOFF_SECONDS, maximum=MAX_BACKOFF_SECONDS):
+    """Exponential backoff: base, 2*base, 4*base, ... capped at maximum."""
+    return min(base * 2 ** (attempts - 1), maximum)
+
+
+def process_batch(executor, workers, batch_size, max_attempts=MAX_ATTEMPTS, backoff=BACKOFF_SECONDS):
+    """
+    Claims a batch, sends it across the thread pool and records the outcomes
+    with one bulk UPDATE for the whole batch.
+    Returns (sent, failed) counts.
+    """
+    logs = claim_batch(batch_size)
+    if not logs:
+        return 0, 0
+
+    # One chunk (and one SMS/SMTP connection) per pool thread
+    chunks = [logs[i::workers] for i in range(workers) if logs[i::workers]]
+    results = {}
+    for chunk_results in executor.map(deliver_chunk, chunks):
+        results.update(chunk_results)
+    errors = [results[log.id] for log in logs]
+
+    now = timezone.now()
+    sent = failed = 0
+    for log, error in zip(logs, errors):
+        log.attempts += 1
+        log.claimed_by = None
+        log.claimed_at = None
+        if error is None:
+            log.status = NotificationLog.Status.SENT
+            log.sent_at = now
+            log.error_message = None
+            sent += 1
+        else:
+            log.error_message = error
+            if log.attempts >= max_attempts:
+                log.status = NotificationLog.Status.FAILED
+            else:
+                log.status = NotificationLog.Status.PENDING
+                log.next_attempt_at = now + datetime.timedelta(seconds=backoff_delay(log.attempts, backoff))
+            failed += 1
+
+    NotificationLog.objects.bulk_update(
+        logs,
+        ['status', 'sent_at', 'error_message', 'attempts', 'next_attempt_at', 'claimed_by', 'claimed_at'],
+    )
+    return sent, failed
+
+
+def run_worker(workers=4, batch_size=50, max_attempts=MAX_ATTEMPTS, backoff=BACKOFF_SECONDS, once=False, idle=None):
+    """
+    Drains the outbox. With once=True, stops when no due messages are left;
+    otherwise calls idle() (e.g. a sleep) whenever the queue is empty.
+    Yields (sent, failed) for every processed batch.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            release_stale_claims()
+            sent, failed = process_batch(executor, workers, batch_size, max_attempts, backoff)
+            if sent or failed:
+                yield sent, failed
+                continue
+            if once:
+                return
+            if idle:
+                idle()
@@ -1,96 +1,168 @@
+import base64
 from django.conf import settings
 from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 from django.utils import timezone
 from .models import NotificationLog
+from .backends import get_sms_backend
+from .backends.base import SMSMessage
 import logging
 
 logger = logging.getLogger(__name__)
 
 class NotificationService:
+    """
+    Sending is split in two:
+    - send_sms / send_email only enqueue a PENDING NotificationLog (the outbox),
+      so callers such as the payment desk return immediately.
+    - deliver() does the actual sending through the configured backends
+      (settings.SMS_BACKEND / settings.EMAIL_BACKEND). It is called by the outbox
+      worker ('manage.py process_notifications'), never on the request thread.
+    """
+
     @staticmethod
     def send_sms(phone_number, message):
         """
-        Sends an SMS to the given phone number.
+        Queues an SMS to the given phone number.
         """
-        # Create Log Entry
-        log = NotificationLog.objects.create(
+        if not phone_number:
+            return False
+
+        NotificationLog.objects.create(
             recipient=phone_number,
             message_type=NotificationLog.Type.SMS,
             body=message,
-            status=NotificationLog.Status.PENDING
+            status=NotificationLog.Status.PENDING,
+            next_attempt_at=timezone.now()
         )
-
-        try:
-            # Check Backend (Default to Console for now)
-            # In future: if settings.SMS_BACKEND == 'TWILIO': ...
-            
-            # CONSOLE BACKEND
-            print(f"\n[SMS SENT] To: {phone_number}\nMessage: {message}\n")
-            
-            log.status = NotificationLog.Status.SENT
-            log.sent_at = timezone.now()
-            log.save()
-            return True
-
-        except Exception as e:
-            logger.error(f"Error sending SMS: {e}")
-            log.status = NotificationLog.Status.FAILED
-            log.error_message = str(e)
-            log.save()
-            return False
+        return True
 
     @staticmethod
-    def send_email(recipient_email, subject, template_name, context, attachment=None):
+    def send_email(recipient_email, subject, template_name, context, attachment=None, attachment_spec=None):
         """
-        Sends an email with optional attachment.
+        Queues an email with an optional attachment.
+        :param attachment: ('filename.pdf', content_bytes, 'application/pdf'), stored with the message
+        :param attachment_spec: description of an attachment to build at send time,
+                                e.g. {"type": "receipt", "transaction_id": 12, "filename": "Receipt.pdf"}
         """
         if not recipient_email:
             return False
 
-        # Render Body
+        # Render Body (cheap, and keeps the template context out of the outbox)
         try:
             html_content = render_to_string(template_name, context)
         except Exception as e:
             logger.error(f"Error rendering email template: {e}")
             return False
 
-        # Create Log
-        log = NotificationLog.objects.create(
+        if attachment and not attachment_spec:
+            filename, content, mimetype = attachment
+            attachment_spec = {
+                'type': 'inline',
+                'filename': filename,
+                'mimetype': mimetype,
+                'content': base64.b64encode(content).decode('ascii'),
+            }
+
+        NotificationLog.objects.create(
             recipient=recipient_email,
             message_type=NotificationLog.Type.EMAIL,
             subject=subject,
-            body=f"Template: {template_name}", # Store template name or brief summary
-            status=NotificationLog.Status.PENDING
+            body=html_content,
+            attachment_spec=attachment_spec,
+            status=NotificationLog.Status.PENDING,
+            next_attempt_at=timezone.now()
         )
+        return True
 
-        try:
-            email = EmailMessage(
-                subject=subject,
-                body=html_content,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[recipient_email]
-            )
-            email.content_subtype = "html"
+    @staticmethod
+    def send_bulk(messages, message_type=NotificationLog.Type.SMS, batch_size=1000):
+        """
+        Queues many messages at once (e.g. a fee reminder to every parent).
+        :param messages: iterable of dicts with 'recipient', 'body' and, for email, 'subject'
+                         ('body' is the final HTML for email). Read lazily, in batches.
+        Returns the number of messages queued.
+        """
+        now = timezone.now()
+        queued = 0
+        batch = []
+        for message in messages:
+            if not message.get('recipient'):
+                continue
+            batch.append(NotificationLog(
+                recipient=message['recipient'],
+                message_type=message_type,
+                subject=message.get('subject'),
+                body=message['body'],
+                status=NotificationLog.Status.PENDING,
+                next_attempt_at=now
+            ))
+            if len(batch) >= batch_size:
+                NotificationLog.objects.bulk_create(batch)
+                queued += len(batch)
+                batch = []
+        if batch:
+            NotificationLog.objects.bulk_create(batch)
+            queued += len(batch)
+        return queued
 
-            if attachment:
-                # attachment = ('filename.pdf', pdf_content, 'application/pdf')
-                email.attach(*attachment)
+    # === Delivery (used by the outbox worker) ===
 
-            email.send(fail_silently=False)
+    @staticmethod
+    def deliver(log, sms_backend=None, email_connection=None):
+        """
+        Sends a queued message. Raises on failure so the worker can retry it.
+        Pass an open sms_backend / email_connection to reuse them across a batch;
+        otherwise the configured backends (settings.SMS_BACKEND / EMAIL_BACKEND) are used.
+        """
+        if log.message_type == NotificationLog.Type.SMS:
+            NotificationService.deliver_sms(log, sms_backend)
+        else:
+            NotificationService.deliver_email(log, email_connection)
+
+    @staticmethod
+    def deliver_sms(log, backend=None):
+        backend = backend or get_sms_backend()
+        message = SMSMessage(log.recipient, log.body)
+        backend.send_messages([message])
+        if not message.sent:
+            raise RuntimeError(message.error or 'Not sent by the SMS backend')
+
+    @staticmethod
+    def deliver_email(log, connection=None):
+        email = EmailMessage(
+            subject=log.subject,
+            body=log.body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[log.recipient],
+            connection=connection
+        )
+        email.content_subtype = "html"
 
-            # Log Success
-            # For Console Backend (Django default), it prints to stdout
-            print(f"\n[EMAIL SENT] To: {recipient_email}\nSubject: {subject}\n")
+        if log.attachment_spec:
+            email.attach(*NotificationService.build_attachment(log.attachment_spec))
 
-            log.status = NotificationLog.Status.SENT
-            log.sent_at = timezone.now()
-            log.save()
-            return True
+        email.send(fail_silently=False)
 
-        except Exception as e:
-            logger.error(f"Error sending email: {e}")
-            log.status = NotificationLog.Status.FAILED
-            log.error_message = str(e)
-            log.save()
-            return False
+    @staticmethod
+    def build_attachment(spec):
+        """
+        Turns an attachment_spec into an ('filename', content, 'mimetype') tuple.
+        """
+        if spec['type'] == 'inline':
+            return (spec['filename'], base64.b64decode(spec['content']), spec['mimetype'])
+
+        if spec['type'] == 'receipt':
+            # Imported here: only the worker renders PDFs
+            from apps.finance.models import Transaction
+            from apps.finance.receipts import receipt_pdf
+
+            transaction = Transaction.objects.select_related('student', 'student_class').get(
+                id=spec['transaction_id']
+            )
+            pdf = receipt_pdf(transaction)
+            if pdf is None:
+                raise ValueError(f"Could not render receipt for transaction {transaction.id}")
+            return (spec['filename'], pdf, 'application/pdf')
+
+        raise ValueError(f"Unknown attachment type: {spec['type']}")
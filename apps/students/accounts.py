@@ -0,0 +1,137 @@
+"""
+Student portal accounts.
+
+Credentials follow the long-standing convention:
+- Username: last name (lowercase), or last name + admission number if taken
+- Password: admission number
+
+Password hashing (PBKDF2) is deliberately slow, so bulk provisioning from the
+management command spreads it over a process pool; admin actions hash in the
+request. Users and links are written with bulk queries.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.db.models import Q
+from apps.users.models import User
+from .models import Student
+
+CHUNK_SIZE = 500
+
+
+def portal_password(student):
+    return student.admission_number
+
+
+def assign_usernames(students):
+    """
+    Picks a unique username for each student, in memory, with one query for
+    the usernames already taken (two if some need a numbered fallback).
+    Returns a list of usernames in the same order.
+    """
+    candidates = set()
+    for student in students:
+        base = student.last_name.lower()
+        candidates.update([base, f"{base}{student.admission_number}"])
+    taken = set(User.objects.filter(username__in=candidates).values_list('username', flat=True))
+
+    # Numbered fallbacks ({base}{admission number}-2, -3...) for the rest
+    prefixes = {
+        f"{student.last_name.lower()}{student.admission_number}-"
+        for student in students
+        if f"{student.last_name.lower()}{student.admission_number}" in taken
+    }
+    if prefixes:
+        fallbacks = Q()
+        for prefix in prefixes:
+            fallbacks |= Q(username__startswith=prefix)
+        taken.update(User.objects.filter(fallbacks).values_list('username', flat=True))
+
+    usernames = []
+    for student in students:
+        base = student.last_name.lower()
+        username = base
+        if username in taken:
+            username = f"{base}{student.admission_number}"
+        suffix = 2
+        while username in taken:
+            username = f"{base}{student.admission_number}-{suffix}"
+            suffix += 1
+        taken.add(username)
+        usernames.append(username)
+    return usernames
+
+
+def init_hashing_worker():
+    # Pool processes may be spawned rather than forked: load the settings
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+
+def hash_passwords(passwords, executor=None):
+    """Hashes passwords, across the executor's processes when one is given."""
+    if executor is None:
+        return [make_password(password) for password in passwords]
+    return list(executor.map(make_password, passwords, chunksize=max(1, len(passwords) // 64)))
+
+
+def provision_accounts(students, workers=0, chunk_size=CHUNK_SIZE):
+    """
+    Creates portal accounts for the students (a queryset) that have none.
+    Usernames are assigned in memory, passwords hashed over a pool of
+    `workers` processes (None: one per CPU; the default 0 hashes in this
+    process, as web requests must not start a pool), users inserted with
+    bulk_create and linked back with bulk_update.
+    Returns a list of (student, username, password) for the new accounts.
+    """
+    students = list(students.filter(user__isnull=True).order_by('id'))
+    if not students:
+        return []
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    executor = None
+    if workers and len(students) > 1:
+        # Children must not inherit open database connections
+        for connection in connections.all():
+            if not connection.in_atomic_block:
+                connection.close()
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_hashing_worker)
+
+    created = []
+    try:
+        for start in range(0, len(students), chunk_size):
+            chunk = students[start:start + chunk_size]
+            passwords = [portal_password(student) for student in chunk]
+            hashes = hash_passwords(passwords, executor)
+
+            with transaction.atomic():
+                usernames = assign_usernames(chunk)
+                users = User.objects.bulk_create([
+                    User(username=User.normalize_username(username), password=hashed, role=User.Role.STUDENT)
+                    for username, hashed in zip(usernames, hashes)
+                ])
+                for student, user in zip(chunk, users):
+                    student.user = user
+                Student.objects.bulk_update(chunk, ['user'])
+
+            created.extend(zip(chunk, usernames, passwords))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return created
+
+
+def provision_account(student):
+    """
+    Creates the portal account for a single student (hashed in-process).
+    Returns (username, password), or None if the student already has one.
+    """
+    created = provision_accounts(Student.objects.filter(id=student.id), workers=0)
+    if not created:
+        return None
+    provisioned, username, password = created[0]
+    student.user = provisioned.user
+    return username, password
@@ -1,3 +1,45 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from .models import Student, Enrollment
+from .accounts import provision_accounts
 
-# Register your models here.
+
+def report_provisioned(modeladmin, request, created):
+    """Shared by the Student and StudentClass portal-account actions."""
+    if created:
+        from apps.audit.utils import log_action
+        from apps.audit.models import AuditLog
+        log_action(request, Student, AuditLog.Action.CREATE, f"Created {len(created)} student portal accounts")
+        modeladmin.message_user(
+            request,
+            f"Created {len(created)} portal account(s). Passwords are the students' admission numbers.",
+            messages.SUCCESS,
+        )
+    else:
+        modeladmin.message_user(request, "All selected students already have portal accounts.", messages.WARNING)
+
+
+@admin.register(Student)
+class StudentAdmin(admin.ModelAdmin):
+    list_display = ('admission_number', 'first_name', 'last_name', 'current_class', 'has_portal_account')
+    list_filter = ('current_class', ('user', admin.EmptyFieldListFilter))
+    search_fields = ('admission_number', 'first_name', 'last_name')
+    list_select_related = ('current_class',)
+    raw_id_fields = ('user',)
+    actions = ['create_portal_accounts']
+
+    @admin.display(boolean=True, description="Portal account")
+    def has_portal_account(self, obj):
+        return obj.user_id is not None
+
+    @admin.action(description="Create portal accounts for selected students")
+    def create_portal_accounts(self, request, queryset):
+        report_provisioned(self, request, provision_accounts(queryset))
+
+
+@admin.register(Enrollment)
+class EnrollmentAdmin(admin.ModelAdmin):
+    list_display = ('student', 'term', 'student_class')
+    list_filter = ('term', 'student_class')
+    search_fields = ('student__admission_number', 'student__first_name', 'student__last_name')
+    list_select_related = ('student', 'term__session', 'student_class')
+    raw_id_fields = ('student',)
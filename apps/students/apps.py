@@ -12,3 +12,7 @@ class StudentsConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.students'
+
+    def ready(self):
+        # Register signal handlers (type-ahead lookup cache, term enrollments)
+        from . import signals  # noqa: F401
@@ -0,0 +1,112 @@
+"""
+Per-term enrollment history.
+
+Enrollment records the class each student was in during a term. A term's
+enrollments are snapshotted from the students' current classes when it becomes
+current (one INSERT ... SELECT), and kept up to date while it is current:
+- a new student is enrolled in the current term (post_save signal)
+- a class change made on the student form moves the current term's enrollment
+Year-end promotion moves current_class only, so the promoted classes are
+enrolled when the next term becomes current and past terms keep their history.
+A term that has not been current yet has no enrollments; its classes are taken
+to be the current ones (see class_members). A past term without enrollments
+(e.g. from before enrollments were recorded) must be snapshotted first: its
+classes then are not known.
+"""
+from collections import defaultdict
+from django.db import connection
+from apps.core.models import Term
+from .models import Enrollment, Student
+
+
+def current_term():
+    return Term.objects.filter(is_current=True).select_related('session').first()
+
+
+def snapshot_enrollments(term):
+    """
+    Enrolls every active student with a class who is not yet enrolled in term,
+    in their current class, with a single statement. Existing enrollments are
+    kept, so this is safe to run again (e.g. after a late admission).
+    Returns the number of students enrolled.
+    """
+    enrollment = Enrollment._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {enrollment} (student_id, term_id, student_class_id)
+            SELECT s.id, %s, s.current_class_id FROM {Student._meta.db_table} s
+            WHERE s.status = %s AND s.current_class_id IS NOT NULL
+            AND NOT EXISTS (SELECT 1 FROM {enrollment} e WHERE e.student_id = s.id AND e.term_id = %s)
+            """,
+            [term.id, Student.Status.ACTIVE, term.id],
+        )
+        return cursor.rowcount
+
+
+def sync_current_enrollment(student):
+    """
+    Makes the student's enrollment in the current term match their current
+    class (removing it if they no longer have one).
+    """
+    term = current_term()
+    if term is None:
+        return
+    if student.current_class_id is None or student.status != Student.Status.ACTIVE:
+        Enrollment.objects.filter(student=student, term=term).delete()
+    else:
+        Enrollment.objects.update_or_create(
+            student=student, term=term, defaults={'student_class_id': student.current_class_id}
+        )
+
+
+def class_members(term_ids, class_ids):
+    """
+    {(term id, class id): [student ids]} for the given terms and classes: the
+    term's enrollments, or for a term without any yet (e.g. next term, billed
+    ahead) the active students currently in each class.
+    Raises ValueError for a past term without enrollments: its members cannot
+    be told from today's classes, so it has to be snapshotted first.
+    """
+    members = defaultdict(list)
+    for student_id, term_id, class_id in Enrollment.objects.filter(
+        term_id__in=term_ids, student_class_id__in=class_ids
+    ).values_list('student_id', 'term_id', 'student_class_id'):
+        members[term_id, class_id].append(student_id)
+
+    enrolled_terms = set(
+        Enrollment.objects.filter(term_id__in=term_ids).values_list('term_id', flat=True).distinct()
+    )
+    unenrolled_terms = set(term_ids) - enrolled_terms
+    if unenrolled_terms:
+        check_not_past(unenrolled_terms)
+        for student_id, class_id in Student.objects.filter(
+            status=Student.Status.ACTIVE, current_class_id__in=class_ids
+        ).values_list('id', 'current_class_id'):
+            for term_id in unenrolled_terms:
+                members[term_id, class_id].append(student_id)
+    return members
+
+
+def check_not_past(term_ids):
+    """
+    Raises ValueError if any of these terms comes before the current term (or,
+    with no current term, before the latest term with enrollments).
+    """
+    reference = current_term()
+    if reference is None:
+        enrolled = Term.objects.filter(id__in=Enrollment.objects.values('term_id')).select_related('session')
+        reference = max(enrolled, key=lambda term: term.sort_key, default=None)
+    if reference is None:
+        return
+    past = [
+        term for term in Term.objects.filter(id__in=term_ids).select_related('session')
+        if term.sort_key < reference.sort_key
+    ]
+    if past:
+        names = ', '.join(f"{term} (id {term.id})" for term in sorted(past, key=lambda term: term.sort_key))
+        raise ValueError(
+            f"No enrollments are recorded for {names}, so it is not known who was in each class then. "
+            "Snapshot the term first with 'manage.py snapshot_enrollments --term-id <id>', "
+            "which enrolls students in their current classes."
+        )
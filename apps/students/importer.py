@@ -0,0 +1,218 @@
+"""
+Bulk student import from CSV or XLSX.
+
+The file is read row by row (never loaded whole), validated in chunks and
+inserted with bulk_create. Valid rows are imported; invalid ones are skipped
+and reported with their row number, so a large intake can be fixed and
+re-uploaded (already imported admission numbers are reported as duplicates).
+
+Portal accounts are not created here: hashing their passwords is the slow part
+of registration and is done separately, in bulk.
+"""
+import csv
+import datetime
+import io
+from dataclasses import dataclass, field
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from apps.core.models import StudentClass
+from .models import Student
+
+CHUNK_SIZE = 500
+
+# Accepted header names (case and spacing don't matter) -> Student field
+COLUMNS = {
+    'admission_number': 'admission_number',
+    'admission_no': 'admission_number',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'class': 'current_class',
+    'current_class': 'current_class',
+    'date_of_birth': 'date_of_birth',
+    'dob': 'date_of_birth',
+    'parent_phone': 'parent_phone',
+    'parent_email': 'parent_email',
+}
+REQUIRED = ['admission_number', 'first_name', 'last_name', 'parent_phone']
+TEXT_FIELDS = ['admission_number', 'first_name', 'last_name', 'parent_phone', 'parent_email']
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y']
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: list = field(default_factory=list)  # (row number, admission number, message)
+
+    @property
+    def error_count(self):
+        return len(self.errors)
+
+
+def normalise_header(name):
+    return str(name or '').strip().lower().replace(' ', '_')
+
+
+def read_csv(file):
+    """
+    Yields (row number, {field: value}) from a binary CSV file.
+    Raises ValueError if the file is not valid CSV (csv.Error is not one).
+    """
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.reader(text)
+        try:
+            header = [COLUMNS.get(normalise_header(h)) for h in next(reader, [])]
+            for number, values in enumerate(reader, start=2):
+                if any(v.strip() for v in values):
+                    yield number, {f: v for f, v in zip(header, values) if f}
+        except csv.Error as e:
+            raise ValueError(f"Could not read the CSV file at line {reader.line_num}: {e}")
+    finally:
+        text.detach()
+
+
+def read_xlsx(file):
+    """Yields (row number, {field: value}) from the first sheet of an XLSX file."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Importing .xlsx files needs the 'openpyxl' package; upload a CSV instead.")
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [COLUMNS.get(normalise_header(h)) for h in next(rows, [])]
+        for number, values in enumerate(rows, start=2):
+            if any(v not in (None, '') for v in values):
+                yield number, {f: v for f, v in zip(header, values) if f}
+    finally:
+        workbook.close()
+
+
+def read_rows(file, filename):
+    """Picks the reader from the file extension."""
+    if filename.lower().endswith('.xlsx'):
+        return read_xlsx(file)
+    if filename.lower().endswith('.csv'):
+        return read_csv(file)
+    raise ValueError("Unsupported file type; upload a .csv or .xlsx file.")
+
+
+def parse_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(str(value).strip(), date_format).date()
+        except ValueError:
+            continue
+    raise ValidationError(f"Invalid date '{value}' (use YYYY-MM-DD)")
+
+
+def build_student(values, class_ids):
+    """
+    Validates one row with the model's own field validators (but without a
+    query per row) and returns an unsaved Student. Raises ValidationError.
+    """
+    data = {}
+    for name in TEXT_FIELDS:
+        value = values.get(name)
+        value = '' if value is None else str(value).strip()
+        if name == 'parent_phone' and isinstance(values.get(name), float):
+            # Excel hands phone numbers over as floats
+            value = str(int(values[name]))
+        if not value:
+            if name in REQUIRED:
+                raise ValidationError(f"Missing {name.replace('_', ' ')}")
+            continue
+        try:
+            data[name] = Student._meta.get_field(name).clean(value, None)
+        except ValidationError as e:
+            raise ValidationError(f"{name.replace('_', ' ').capitalize()}: {' '.join(e.messages)}")
+
+    if values.get('date_of_birth') not in (None, ''):
+        data['date_of_birth'] = parse_date(values['date_of_birth'])
+
+    class_name = str(values.get('current_class') or '').strip()
+    if class_name:
+        class_id = class_ids.get(class_name.lower())
+        if class_id is None:
+            raise ValidationError(f"Unknown class '{class_name}'")
+        data['current_class_id'] = class_id
+
+    return Student(**data)
+
+
+def import_students(rows, chunk_size=CHUNK_SIZE, dry_run=False):
+    """
+    Imports (row number, values) pairs as produced by read_rows().
+    Class names are resolved from one preloaded map; duplicates are checked
+    with one query per chunk. Returns an ImportResult.
+    """
+    result = ImportResult()
+    class_ids = {name.lower(): pk for pk, name in StudentClass.objects.values_list('id', 'name')}
+    seen = set()
+
+    chunk = []
+    for number, values in rows:
+        chunk.append((number, values))
+        if len(chunk) >= chunk_size:
+            import_chunk(chunk, class_ids, seen, result, dry_run)
+            chunk = []
+    if chunk:
+        import_chunk(chunk, class_ids, seen, result, dry_run)
+
+    if result.created and not dry_run:
+        # bulk_create bypasses the post_save signals that keep these caches
+        # fresh and enroll new students in the current term
+        from apps.core.utils import invalidate_home_stats
+        from .enrollment import current_term, snapshot_enrollments
+        from .search import invalidate_lookup_cache
+        invalidate_home_stats()
+        invalidate_lookup_cache()
+        term = current_term()
+        if term is not None:
+            snapshot_enrollments(term)
+    return result
+
+
+def import_chunk(chunk, class_ids, seen, result, dry_run):
+    students = []
+    for number, values in chunk:
+        try:
+            student = build_student(values, class_ids)
+        except ValidationError as e:
+            result.errors.append((number, str(values.get('admission_number') or ''), ' '.join(e.messages)))
+            continue
+        if student.admission_number in seen:
+            result.errors.append((number, student.admission_number, "Duplicate admission number in file"))
+            continue
+        seen.add(student.admission_number)
+        students.append((number, student))
+
+    existing = set(Student.objects.filter(
+        admission_number__in=[s.admission_number for _, s in students]
+    ).values_list('admission_number', flat=True))
+
+    new_students = []
+    for number, student in students:
+        if student.admission_number in existing:
+            result.errors.append((number, student.admission_number, "Admission number already registered"))
+        else:
+            new_students.append(student)
+
+    if new_students and not dry_run:
+        with transaction.atomic():
+            Student.objects.bulk_create(new_students)
+    result.created += len(new_students)
+
+
+def error_report_csv(result):
+    """The per-row error report as CSV text."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['row', 'admission_number', 'error'])
+    writer.writerows(sorted(result.errors))
+    return output.getvalue()
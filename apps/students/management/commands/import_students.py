@@ -0,0 +1,38 @@
+import time
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from apps.students.importer import CHUNK_SIZE, error_report_csv, import_students, read_rows
+
+
+class Command(BaseCommand):
+    help = "Imports students from a CSV or XLSX file and reports the rows that were rejected."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or XLSX file with a header row")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows validated and inserted per step")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only, insert nothing")
+        parser.add_argument('--errors', dest='errors_path', help="Write the per-row error report to this CSV file")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f"File not found: {path}")
+
+        start = time.perf_counter()
+        with path.open('rb') as f:
+            try:
+                result = import_students(read_rows(f, path.name), options['chunk_size'], options['dry_run'])
+            except ValueError as e:
+                raise CommandError(str(e))
+        elapsed = time.perf_counter() - start
+
+        for row, admission_number, message in sorted(result.errors):
+            self.stdout.write(self.style.WARNING(f"Row {row} ({admission_number or '-'}): {message}"))
+        if options['errors_path'] and result.errors:
+            Path(options['errors_path']).write_text(error_report_csv(result), encoding='utf-8')
+            self.stdout.write(f"Error report written to {options['errors_path']}")
+
+        verb = "Would import" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result.created} student(s) in {elapsed:.1f}s; {result.error_count} row(s) rejected."
+        ))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.models import StudentClass
+from apps.students.promotion import GRADUATE, preview_promotion, promote_students, stored_mapping
+
+
+class Command(BaseCommand):
+    help = "Year-end promotion: moves every active student to the next class (or graduates them)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--map', action='append', default=[], metavar='"FROM=TO"',
+                            help="Move class FROM to class TO, e.g. --map \"Form 1=Form 2\" (repeatable)")
+        parser.add_argument('--graduate', action='append', default=[], metavar='CLASS',
+                            help="Graduate this class (repeatable)")
+        parser.add_argument('--dry-run', action='store_true', help="Only show what would happen")
+
+    def handle(self, *args, **options):
+        if options['map'] or options['graduate']:
+            classes = {name.lower(): pk for pk, name in StudentClass.objects.values_list('id', 'name')}
+
+            def class_id(name):
+                try:
+                    return classes[name.strip().lower()]
+                except KeyError:
+                    raise CommandError(f"Unknown class '{name.strip()}'")
+
+            mapping = {}
+            for pair in options['map']:
+                source, sep, target = pair.partition('=')
+                if not sep:
+                    raise CommandError(f"Expected FROM=TO, got '{pair}'")
+                mapping[class_id(source)] = class_id(target)
+            for name in options['graduate']:
+                mapping[class_id(name)] = GRADUATE
+        else:
+            # The mapping saved from the Year-End Promotion page
+            mapping = stored_mapping()
+
+        if options['dry_run']:
+            plan = preview_promotion(mapping)
+        else:
+            try:
+                plan = promote_students(mapping)
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        for step in plan:
+            target = "graduate" if step['graduates'] else step['to_class'].name
+            self.stdout.write(f"{step['from_class'].name} -> {target}: {step['count']} student(s)")
+
+        total = sum(step['count'] for step in plan)
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"Dry run: {total} student(s) would be promoted or graduated."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Promoted or graduated {total} student(s)."))
@@ -0,0 +1,42 @@
+import csv
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.models import StudentClass
+from apps.students.accounts import CHUNK_SIZE, provision_accounts
+from apps.students.models import Student
+
+
+class Command(BaseCommand):
+    help = "Creates portal accounts for students without one (all, or one class)."
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--class-id', type=int, help="Only students in this class")
+        group.add_argument('--class-name', help="Only students in this class (by name)")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Password hashing processes (default: one per CPU, 0 = no pool)")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Accounts inserted per step")
+        parser.add_argument('--output', help="Write the new usernames and passwords to this CSV file")
+
+    def handle(self, *args, **options):
+        students = Student.objects.all()
+        if options['class_id'] is not None or options['class_name']:
+            lookup = {'id': options['class_id']} if options['class_id'] is not None else {'name__iexact': options['class_name']}
+            student_class = StudentClass.objects.filter(**lookup).first()
+            if student_class is None:
+                raise CommandError("Class not found")
+            students = students.filter(current_class=student_class)
+
+        start = time.perf_counter()
+        created = provision_accounts(students, workers=options['workers'], chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - start
+
+        if options['output'] and created:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['admission_number', 'name', 'username', 'password'])
+                for student, username, password in created:
+                    writer.writerow([student.admission_number, student.full_name, username, password])
+            self.stdout.write(f"Credentials written to {options['output']}")
+
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} portal account(s) in {elapsed:.1f}s."))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.students.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text student search index from the students table."
+
+    def handle(self, *args, **options):
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS("Student search index rebuilt."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.models import Term
+from apps.students.enrollment import current_term, snapshot_enrollments
+
+
+class Command(BaseCommand):
+    help = "Enrolls every active student in a term (default: the current term) in their current class."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--term-id', type=int, help="Term to snapshot (default: the current term)")
+
+    def handle(self, *args, **options):
+        if options['term_id']:
+            term = Term.objects.filter(id=options['term_id']).select_related('session').first()
+            if term is None:
+                raise CommandError(f"No term with id {options['term_id']}")
+        else:
+            term = current_term()
+            if term is None:
+                raise CommandError("No current term; pass --term-id")
+
+        count = snapshot_enrollments(term)
+        self.stdout.write(self.style.SUCCESS(f"Enrolled {count} student(s) in {term}."))
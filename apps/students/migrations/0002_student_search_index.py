@@ -0,0 +1,87 @@
+from django.db import migrations
+
+# SQLite: an external-content FTS5 table over the searchable columns, kept in
+# sync by triggers so every write path (save, bulk_create, update) is covered.
+# A migration that rebuilds students_student on SQLite drops the triggers and
+# must recreate them from SQLITE_TRIGGERS (see 0003_student_status).
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER students_student_fts_insert AFTER INSERT ON students_student BEGIN
+        INSERT INTO students_student_fts(rowid, first_name, last_name, admission_number, parent_phone)
+        VALUES (new.id, new.first_name, new.last_name, new.admission_number, new.parent_phone);
+    END
+    """,
+    """
+    CREATE TRIGGER students_student_fts_delete AFTER DELETE ON students_student BEGIN
+        INSERT INTO students_student_fts(students_student_fts, rowid, first_name, last_name, admission_number, parent_phone)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.admission_number, old.parent_phone);
+    END
+    """,
+    """
+    CREATE TRIGGER students_student_fts_update AFTER UPDATE OF first_name, last_name, admission_number, parent_phone
+    ON students_student BEGIN
+        INSERT INTO students_student_fts(students_student_fts, rowid, first_name, last_name, admission_number, parent_phone)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.admission_number, old.parent_phone);
+        INSERT INTO students_student_fts(rowid, first_name, last_name, admission_number, parent_phone)
+        VALUES (new.id, new.first_name, new.last_name, new.admission_number, new.parent_phone);
+    END
+    """,
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE students_student_fts USING fts5(
+        first_name, last_name, admission_number, parent_phone,
+        content='students_student', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+] + SQLITE_TRIGGERS + [
+    "INSERT INTO students_student_fts(students_student_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS students_student_fts_update",
+    "DROP TRIGGER IF EXISTS students_student_fts_delete",
+    "DROP TRIGGER IF EXISTS students_student_fts_insert",
+    "DROP TABLE IF EXISTS students_student_fts",
+]
+
+# PostgreSQL: a generated tsvector column (maintained by the database on every
+# write) with a GIN index. It is not a model field; apps.students.search queries it.
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE students_student ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(admission_number, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(parent_phone, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX students_student_search_idx ON students_student USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS students_student_search_idx",
+    "ALTER TABLE students_student DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def run_for_vendor(statements_by_vendor):
+    def run(apps, schema_editor):
+        for sql in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run_for_vendor({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:06
+
+from importlib import import_module
+from django.db import migrations, models
+
+search_index = import_module('apps.students.migrations.0002_student_search_index')
+
+
+def recreate_search_triggers(apps, schema_editor):
+    """
+    On SQLite, changing students_student may rebuild the table, which drops the
+    full-text search triggers; (re)create them (the index itself is untouched,
+    ids are preserved).
+    """
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in search_index.SQLITE_REVERSE[:3] + search_index.SQLITE_TRIGGERS:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0002_student_search_index'),
+    ]
+
+    # Restore the triggers after the schema change in both directions
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, recreate_search_triggers),
+        migrations.AddField(
+            model_name='student',
+            name='status',
+            field=models.CharField(choices=[('ACTIVE', 'Active'), ('GRADUATED', 'Graduated')], default='ACTIVE', max_length=20),
+        ),
+        migrations.RunPython(recreate_search_triggers, migrations.RunPython.noop),
+    ]
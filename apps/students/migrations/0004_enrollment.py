@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_enrollments(apps, schema_editor):
+    """
+    Rebuilds what history the ledger holds: every fee invoice says which class
+    the student was billed with in that fee's term. The current term is then
+    completed from the students' current classes.
+    """
+    Enrollment = apps.get_model('students', 'Enrollment')
+    Student = apps.get_model('students', 'Student')
+    Term = apps.get_model('core', 'Term')
+    Transaction = apps.get_model('finance', 'Transaction')
+    FeeStructure = apps.get_model('finance', 'FeeStructure')
+
+    enrollment = Enrollment._meta.db_table
+    student = Student._meta.db_table
+    schema_editor.execute(
+        f"""
+        INSERT INTO {enrollment} (student_id, term_id, student_class_id)
+        SELECT t.student_id, f.term_id, MIN(f.student_class_id)
+        FROM {Transaction._meta.db_table} t
+        JOIN {FeeStructure._meta.db_table} f ON f.id = t.fee_structure_id
+        WHERE t.transaction_type = 'INVOICE'
+        GROUP BY t.student_id, f.term_id
+        """
+    )
+
+    term_id = Term.objects.filter(is_current=True).values_list('id', flat=True).first()
+    if term_id is not None:
+        schema_editor.execute(
+            f"""
+            INSERT INTO {enrollment} (student_id, term_id, student_class_id)
+            SELECT s.id, %s, s.current_class_id FROM {student} s
+            WHERE s.status = 'ACTIVE' AND s.current_class_id IS NOT NULL
+            AND NOT EXISTS (SELECT 1 FROM {enrollment} e WHERE e.student_id = s.id AND e.term_id = %s)
+            """,
+            [term_id, term_id],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_class_promotion_mapping'),
+        ('students', '0003_student_status'),
+        ('finance', '0003_transaction_fee_structure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Enrollment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='students.student')),
+                ('student_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='core.studentclass')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='core.term')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'student_class'], name='enrollment_term_class_idx')],
+                'unique_together': {('student', 'term')},
+            },
+        ),
+        migrations.RunPython(backfill_enrollments, migrations.RunPython.noop),
+    ]
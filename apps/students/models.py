@@ -1,12 +1,16 @@
 from django.db import models
 from django.conf import settings
-from apps.core.models import StudentClass, AcademicSession
+from apps.core.models import StudentClass, AcademicSession, Term
 
 class Student(models.Model):
     """
     Represents a Student profile.
     Linked to a User account (optional, for portal access) and a Class.
     """
+    class Status(models.TextChoices):
+        ACTIVE = 'ACTIVE', 'Active'
+        GRADUATED = 'GRADUATED', 'Graduated'
+
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL, 
         on_delete=models.SET_NULL, 
@@ -27,6 +31,9 @@ class Student(models.Model):
         related_name='students'
     )
     
+    # Graduated students leave their class (current_class is cleared) but keep their ledger
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.ACTIVE)
+
     parent_phone = models.CharField(max_length=15, help_text="Primary contact number")
     parent_email = models.EmailField(null=True, blank=True)
     
@@ -46,6 +53,42 @@ class Student(models.Model):
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
 
+    def recalculate_balance(self):
+        """
+        Recalculates the cached balance from the full ledger.
+        Debt = Sum of Invoices
+        Credit = Sum of Payments + Waivers
+        Balance = Debt - Credit
+
+        Transactions keep the balance up to date incrementally, so this is only
+        needed as a slow path to repair drift (see the recalculate_balances command).
+        """
+        totals = self.transactions.aggregate(
+            debt=models.Sum('amount', filter=models.Q(transaction_type='INVOICE')),
+            credit=models.Sum('amount', filter=models.Q(transaction_type__in=['PAYMENT', 'WAIVER'])),
+        )
+        self.current_balance = (totals['debt'] or 0) - (totals['credit'] or 0)
+        self.save(update_fields=['current_balance'])
+
+class Enrollment(models.Model):
+    """
+    The class a student was in during a term.
+    Fees are billed and counted against this history rather than the student's
+    current class, which moves on at every promotion (see apps.students.enrollment).
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='enrollments')
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name='enrollments')
+    student_class = models.ForeignKey(StudentClass, on_delete=models.CASCADE, related_name='enrollments')
+
+    class Meta:
+        unique_together = ('student', 'term')
+        indexes = [
+            models.Index(fields=['term', 'student_class'], name='enrollment_term_class_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.student_class} ({self.term})"
+
 # Note: In a more complex system, we might have a separate Parent model linked to multiple students.
 # For simplicity in this implementation, we store parent contact info directly on the student,
 # but we can assume the 'User' with role PARENT will effectively look up students by their phone/email.
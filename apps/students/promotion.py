@@ -0,0 +1,145 @@
+"""
+Year-end class promotion.
+
+A mapping {class id: next class id or GRADUATE} moves every active student of
+a class in one set-based UPDATE. All SET expressions of a single UPDATE see the
+row as it was before the statement, so chains (Form 1 -> Form 2 -> Form 3) never
+promote a student twice, whatever the order of the classes.
+Classes left out of the mapping stay where they are.
+
+Promotion runs once per academic session: it stamps the current session's
+promoted_at in the same transaction, so a repeated submit, or running the
+promote_students command afterwards with the saved mapping, is refused.
+"""
+import hashlib
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Value, When
+from django.utils import timezone
+from apps.core.models import AcademicSession, StudentClass
+from .models import Student
+
+GRADUATE = 'GRADUATE'
+
+
+def stored_mapping():
+    """The mapping saved on the classes (StudentClass.next_class / graduates)."""
+    mapping = {}
+    for class_id, next_class_id, graduates in StudentClass.objects.values_list('id', 'next_class_id', 'graduates'):
+        if graduates:
+            mapping[class_id] = GRADUATE
+        elif next_class_id and next_class_id != class_id:
+            mapping[class_id] = next_class_id
+    return mapping
+
+
+def save_mapping(mapping):
+    """Stores a mapping on the classes so next year starts from it."""
+    classes = list(StudentClass.objects.all())
+    for student_class in classes:
+        target = mapping.get(student_class.id)
+        student_class.graduates = target == GRADUATE
+        student_class.next_class_id = target if target not in (None, GRADUATE) else None
+    StudentClass.objects.bulk_update(classes, ['next_class', 'graduates'])
+
+
+def preview_promotion(mapping):
+    """
+    What promote_students(mapping) would do, from one GROUP BY query.
+    Returns a list of {'from_class', 'to_class' (None when graduating),
+    'graduates', 'count'}, ordered by class name.
+    """
+    counts = dict(
+        Student.objects.filter(status=Student.Status.ACTIVE, current_class_id__in=mapping)
+        .values_list('current_class_id').annotate(count=Count('id')).order_by()
+    )
+    classes = StudentClass.objects.in_bulk(
+        set(mapping) | {target for target in mapping.values() if target != GRADUATE}
+    )
+    plan = []
+    for class_id, target in mapping.items():
+        plan.append({
+            'from_class': classes[class_id],
+            'to_class': None if target == GRADUATE else classes[target],
+            'graduates': target == GRADUATE,
+            'count': counts.get(class_id, 0),
+        })
+    return sorted(plan, key=lambda step: step['from_class'].name)
+
+
+def plan_token(plan):
+    """
+    A digest of a previewed plan (classes, targets and head counts). The
+    promotion page posts it back with the promote button, so a plan that no
+    longer matches what was shown is not applied.
+    """
+    digest = hashlib.sha256()
+    for step in plan:
+        target = GRADUATE if step['graduates'] else step['to_class'].id
+        digest.update(f"{step['from_class'].id}:{target}:{step['count']};".encode())
+    return digest.hexdigest()[:16]
+
+
+def promote_students(mapping, actor=None, ip_address=None, token=None):
+    """
+    Applies the mapping in a single transaction: one UPDATE for all students,
+    and one audit entry per class (not per student). Marks the current session
+    as promoted in the same transaction.
+    Raises ValueError if there is no current session, it has been promoted
+    already, or token is given and does not match the plan (see plan_token).
+    Returns the plan that was applied (see preview_promotion).
+    """
+    from apps.audit.models import AuditLog
+    from apps.audit.utils import write_entries
+
+    if not mapping:
+        return []
+
+    with transaction.atomic():
+        session = AcademicSession.objects.filter(is_current=True).first()
+        if session is None:
+            raise ValueError("Set the current academic session before promoting students.")
+        # Claimed with a conditional UPDATE, so only one of two concurrent runs gets it
+        if not AcademicSession.objects.filter(pk=session.pk, promoted_at__isnull=True).update(
+            promoted_at=timezone.now()
+        ):
+            raise ValueError(
+                f"Students have already been promoted for {session.name}. "
+                "Make the next academic session current before promoting again."
+            )
+
+        plan = preview_promotion(mapping)
+        if token is not None and token != plan_token(plan):
+            raise ValueError("The class sizes or the mapping changed since the preview; check it and try again.")
+
+        graduating = [class_id for class_id, target in mapping.items() if target == GRADUATE]
+        Student.objects.filter(status=Student.Status.ACTIVE, current_class_id__in=mapping).update(
+            current_class_id=Case(
+                *[When(current_class_id=class_id, then=Value(None if target == GRADUATE else target))
+                  for class_id, target in mapping.items()],
+                output_field=models.BigIntegerField(),
+            ),
+            status=Case(
+                When(current_class_id__in=graduating, then=Value(Student.Status.GRADUATED)),
+                default=F('status'),
+            ),
+        )
+
+        write_entries([
+            AuditLog(
+                actor=actor,
+                action=AuditLog.Action.UPDATE,
+                target_model='StudentClass',
+                target_object_id=str(step['from_class'].id),
+                target_repr=step['from_class'].name,
+                details=(f"Year-end promotion: {step['count']} students graduated" if step['graduates'] else
+                         f"Year-end promotion: {step['count']} students moved to {step['to_class'].name}"),
+                ip_address=ip_address,
+            )
+            for step in plan if step['count']
+        ])
+
+        # The type-ahead cache shows class names
+        from .search import invalidate_lookup_cache
+        transaction.on_commit(invalidate_lookup_cache)
+
+    return plan
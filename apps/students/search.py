@@ -0,0 +1,139 @@
+"""
+Full-text student search.
+
+Names, admission number and parent phone are indexed by the database itself
+(see migration 0002_student_search_index):
+- SQLite: the students_student_fts FTS5 table, kept in sync by triggers
+- PostgreSQL: the generated students_student.search_vector column (GIN indexed)
+Other backends fall back to icontains filters.
+
+Every word of the query is matched as a prefix, so "jo ka" finds "John Kamau".
+"""
+import hashlib
+import re
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'students_student_fts'
+
+LOOKUP_LIMIT = 10
+LOOKUP_GENERATION_KEY = 'students:lookup:generation'
+
+# bm25 column weights for first_name, last_name, admission_number, parent_phone
+SQLITE_RANK = f"bm25({FTS_TABLE}, 10.0, 10.0, 8.0, 2.0)"
+
+
+def search_terms(query):
+    """
+    Splits user input into plain word tokens. Everything else (quotes, '*',
+    operators, punctuation such as the '/' in ADM/2024/001) is dropped, so
+    input can never change the meaning of the full-text query.
+    """
+    return re.findall(r'\w+', query.lower())
+
+
+def search_students(queryset, query):
+    """
+    Filters a Student queryset to the rows matching query and orders it by
+    relevance (best match first). Returns the queryset unchanged for an empty query.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+
+    if connection.vendor == 'sqlite':
+        # The rank is looked up by rowid in the matches, materialized once per
+        # query: reading bm25() per row would re-run the FTS5 search for each
+        match = ' '.join(f'"{term}"*' for term in terms)
+        table = queryset.model._meta.db_table
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f"WITH matches AS MATERIALIZED (SELECT rowid AS id, {SQLITE_RANK} AS rank "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s) "
+                f"SELECT rank FROM matches WHERE matches.id = {table}.id",
+                [match], output_field=FloatField(),
+            )
+        ).order_by('search_rank', 'first_name', 'id')
+
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return queryset.filter(
+            RawSQL("search_vector @@ to_tsquery('simple', %s)", [tsquery], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL("ts_rank(search_vector, to_tsquery('simple', %s))", [tsquery], output_field=FloatField())
+        ).order_by('-search_rank', 'first_name', 'id')
+
+    for term in terms:
+        queryset = queryset.filter(
+            Q(first_name__icontains=term) |
+            Q(last_name__icontains=term) |
+            Q(admission_number__icontains=term) |
+            Q(parent_phone__icontains=term)
+        )
+    return queryset
+
+
+def rebuild_search_index():
+    """
+    Rebuilds the SQLite index from the students table (e.g. after restoring a
+    backup taken without the triggers). PostgreSQL maintains its column itself.
+    """
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def lookup_generation():
+    return cache.get_or_set(LOOKUP_GENERATION_KEY, 1, None)
+
+
+def invalidate_lookup_cache():
+    """
+    Drops every cached lookup result (by moving to a new key generation).
+    Called when a student is added, renamed, moved or removed.
+    """
+    try:
+        cache.incr(LOOKUP_GENERATION_KEY)
+    except ValueError:
+        cache.set(LOOKUP_GENERATION_KEY, 2, None)
+
+
+def lookup_students(query, limit=LOOKUP_LIMIT):
+    """
+    Type-ahead lookup for the payment desk.
+    Returns up to limit dicts (id, admission_number, name, class_name, current_balance),
+    best match first.
+
+    The matches for a prefix are cached for STUDENT_LOOKUP_CACHE_TIMEOUT seconds;
+    balances are not, they are read fresh by primary key on every call so a
+    payment shows up immediately.
+    """
+    from .models import Student
+
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    digest = hashlib.md5(' '.join(terms).encode('utf-8')).hexdigest()
+    key = f"students:lookup:{lookup_generation()}:{limit}:{digest}"
+    matches = cache.get(key)
+    if matches is None:
+        matches = list(
+            search_students(Student.objects.all(), query)
+            .values('id', 'admission_number', 'first_name', 'last_name', 'current_class__name')[:limit]
+        )
+        cache.set(key, matches, settings.STUDENT_LOOKUP_CACHE_TIMEOUT)
+
+    balances = dict(Student.objects.filter(id__in=[m['id'] for m in matches]).values_list('id', 'current_balance'))
+    return [{
+        'id': m['id'],
+        'admission_number': m['admission_number'],
+        'name': f"{m['first_name']} {m['last_name']}",
+        'class_name': m['current_class__name'],
+        'current_balance': balances[m['id']],
+    } for m in matches if m['id'] in balances]
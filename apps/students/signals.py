@@ -0,0 +1,32 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.core.models import Term
+from .models import Student
+from .search import invalidate_lookup_cache
+from .enrollment import snapshot_enrollments, sync_current_enrollment
+
+LOOKUP_FIELDS = {'admission_number', 'first_name', 'last_name', 'current_class'}
+
+@receiver(post_save, sender=Student)
+def student_saved(sender, instance, created, update_fields=None, **kwargs):
+    """
+    A new or edited student may change what a lookup prefix returns.
+    Balance-only saves don't (balances are never cached).
+    """
+    if created or update_fields is None or LOOKUP_FIELDS & set(update_fields):
+        invalidate_lookup_cache()
+    if created:
+        sync_current_enrollment(instance)
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    invalidate_lookup_cache()
+
+@receiver(post_save, sender=Term)
+def term_saved(sender, instance, **kwargs):
+    """
+    Snapshots the enrollments of a term when it becomes current. Students already
+    enrolled are skipped, so saving the current term again only adds late admissions.
+    """
+    if instance.is_current:
+        snapshot_enrollments(instance)
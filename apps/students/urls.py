@@ -3,10 +3,15 @@ from . import views
 
 urlpatterns = [
     path('', views.student_list, name='student_list'),
+    path('lookup/', views.student_lookup, name='student_lookup'),
     path('add/', views.student_create, name='student_create'),
+    path('import/', views.student_import, name='student_import'),
+    path('import/errors/', views.student_import_errors, name='student_import_errors'),
     path('<int:student_id>/edit/', views.student_update, name='student_update'),
     path('<int:student_id>/delete/', views.student_delete, name='student_delete'),
     path('<int:student_id>/', views.student_detail, name='student_detail'),
+    path('<int:student_id>/transactions/', views.student_transactions, name='student_transactions'),
     path('create-account/<int:student_id>/', views.create_portal_account, name='create_portal_account'),
     path('portal/', views.portal_dashboard, name='student_portal'),
+    path('portal/transactions/', views.portal_transactions, name='portal_transactions'),
 ]
@@ -3,6 +3,7 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from apps.users.models import User
 from apps.finance.models import Transaction
+from apps.finance.ledger import student_ledger
 from .models import Student
 from .forms import StudentForm
 
@@ -11,8 +12,14 @@ def is_admin(user):
     return user.role in [User.Role.ADMIN, User.Role.BURSAR, User.Role.TEACHER]
 
 from django.core.paginator import Paginator
-from django.db.models import Q
 from apps.core.models import StudentClass
+from django.http import JsonResponse, HttpResponse
+from django.urls import reverse
+from django.utils.http import urlencode
+from .search import search_students, lookup_students
+from .importer import read_rows, import_students, error_report_csv
+from .accounts import provision_account
+from .enrollment import sync_current_enrollment
 
 @login_required
 @user_passes_test(is_admin)
@@ -25,13 +32,9 @@ def student_list(request):
     
     students = Student.objects.select_related('current_class').all().order_by('current_class', 'first_name')
     
-    # Search
+    # Search (full-text index, best matches first)
     if query:
-        students = students.filter(
-            Q(first_name__icontains=query) | 
-            Q(last_name__icontains=query) | 
-            Q(admission_number__icontains=query)
-        )
+        students = search_students(students, query)
         
     # Filter by Class
     if class_filter and class_filter.isdigit():
@@ -53,6 +56,20 @@ def student_list(request):
     }
     return render(request, 'students/student_list.html', context)
 
+@login_required
+@user_passes_test(is_admin)
+def student_lookup(request):
+    """
+    JSON type-ahead for the payment desk: ?q=<admission number or name prefix>.
+    Each result links straight to the payment form.
+    """
+    results = lookup_students(request.GET.get('q', ''))
+    for result in results:
+        result['current_balance'] = str(result['current_balance'])
+        result['payment_url'] = reverse('record_payment', args=[result['id']])
+        result['detail_url'] = reverse('student_detail', args=[result['id']])
+    return JsonResponse({'results': results})
+
 @login_required
 @user_passes_test(is_admin)
 def create_portal_account(request, student_id):
@@ -68,18 +85,8 @@ def create_portal_account(request, student_id):
         messages.warning(request, "This student already has a portal account.")
         return redirect('student_detail', student_id=student.id)
     
-    # Logic: Username = Lastname, Password = Admission No
-    username = student.last_name.lower()
-    password = student.admission_number
-    
-    # Check if username exists, append admission number if so to ensure uniqueness
-    if User.objects.filter(username=username).exists():
-        username = f"{student.last_name.lower()}{student.admission_number}"
-    
     try:
-        user = User.objects.create_user(username=username, password=password, role=User.Role.STUDENT)
-        student.user = user
-        student.save()
+        username, password = provision_account(student)
         messages.success(request, f"Portal account created! Username: {username}, Password: {password}")
     except Exception as e:
         messages.error(request, f"Error creating account: {e}")
@@ -100,13 +107,38 @@ def portal_dashboard(request):
     
     # === MARK AS VIEWED LOGIC ===
     # When student visits dashboard, mark all their 'INVOICE' transactions as viewed
-    Transaction.objects.filter(
-        student=student, 
-        transaction_type=Transaction.TransactionType.INVOICE, 
-        is_viewed=False
-    ).update(is_viewed=True)
+    # (only writes when there is something new to mark)
+    Transaction.mark_invoices_viewed(student.id)
     
-    return render(request, 'students/portal_dashboard.html', {'student': student})
+    ledger = student_ledger(student.id, limit=10)
+    return render(request, 'students/portal_dashboard.html', {'student': student, 'ledger': ledger})
+
+def transaction_history_context(request, student, page_url):
+    """
+    Shared by the staff and portal history pages: one ledger page and its pager links.
+    """
+    cursor = request.GET.get('after')
+    ledger = student_ledger(student.id, cursor=cursor)
+    return {
+        'student': student,
+        'ledger': ledger,
+        'first_page_url': page_url if cursor else None,
+        'older_url': f"{page_url}?{urlencode({'after': ledger.next_cursor})}" if ledger.has_more else None,
+    }
+
+@login_required
+def portal_transactions(request):
+    """
+    The logged-in student's full transaction history (keyset paginated).
+    """
+    if not hasattr(request.user, 'student_profile'):
+        messages.error(request, "You are not linked to a student profile.")
+        return redirect('home')
+
+    student = request.user.student_profile
+    context = transaction_history_context(request, student, reverse('portal_transactions'))
+    context['back_url'] = reverse('student_portal')
+    return render(request, 'students/transaction_history.html', context)
 
 @login_required
 @user_passes_test(is_admin)
@@ -121,17 +153,9 @@ def student_create(request):
             
             # === Auto-Create Portal Account ===
             try:
-                username = student.last_name.lower()
-                password = student.admission_number
-                
-                # Ensure username uniqueness
-                if User.objects.filter(username=username).exists():
-                    username = f"{student.last_name.lower()}{student.admission_number}"
-                
-                if not student.user:
-                    user = User.objects.create_user(username=username, password=password, role=User.Role.STUDENT)
-                    student.user = user
-                    student.save()
+                credentials = provision_account(student)
+                if credentials:
+                    username, password = credentials
                     messages.success(request, f"Student registered! Account created. User: {username}, Pass: {password}")
                 else:
                     messages.success(request, 'Student registered successfully!')
@@ -150,6 +174,56 @@ def student_create(request):
     
     return render(request, 'students/student_form.html', {'form': form, 'title': 'Register Student'})
 
+@login_required
+@user_passes_test(is_admin)
+def student_import(request):
+    """
+    Registers many students at once from an uploaded CSV or XLSX file.
+    Valid rows are imported; the others are listed with their row number
+    and can be downloaded as a CSV error report.
+    """
+    context = {}
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if not upload:
+            messages.error(request, "Please choose a file to import.")
+            return redirect('student_import')
+
+        try:
+            result = import_students(read_rows(upload, upload.name), dry_run='dry_run' in request.POST)
+        except ValueError as e:
+            messages.error(request, str(e))
+            return redirect('student_import')
+
+        if 'dry_run' in request.POST:
+            messages.info(request, f"Check complete: {result.created} row(s) ready to import, {result.error_count} error(s).")
+        else:
+            from apps.audit.utils import log_action
+            from apps.audit.models import AuditLog
+            log_action(request, Student, AuditLog.Action.CREATE,
+                       f"Imported {result.created} students from {upload.name} ({result.error_count} rows rejected)")
+            messages.success(request, f"Imported {result.created} student(s). {result.error_count} row(s) had errors.")
+
+        # Keep the report for the download link
+        request.session['student_import_errors'] = error_report_csv(result) if result.errors else None
+        context = {'result': result, 'errors': sorted(result.errors)[:500]}
+
+    return render(request, 'students/student_import.html', context)
+
+@login_required
+@user_passes_test(is_admin)
+def student_import_errors(request):
+    """
+    Downloads the error report of the last import as CSV.
+    """
+    report = request.session.get('student_import_errors')
+    if not report:
+        messages.warning(request, "There is no error report to download.")
+        return redirect('student_import')
+    response = HttpResponse(report, content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="student_import_errors.csv"'
+    return response
+
 @login_required
 @user_passes_test(is_admin)
 def student_update(request, student_id):
@@ -162,6 +236,8 @@ def student_update(request, student_id):
         form = StudentForm(request.POST, instance=student)
         if form.is_valid():
             student = form.save()
+            if 'current_class' in form.changed_data:
+                sync_current_enrollment(student)
             
             # Audit Log
             from apps.audit.utils import log_action
@@ -175,34 +251,34 @@ def student_update(request, student_id):
         
     return render(request, 'students/student_form.html', {'form': form, 'title': 'Edit Student'})
 
-from django.db.models import Sum
-
 @login_required
 @user_passes_test(is_admin)
 def student_detail(request, student_id):
-    student = get_object_or_404(Student, id=student_id)
-    
-    # Financial Overview
-    total_invoiced = student.transactions.filter(
-        transaction_type=Transaction.TransactionType.INVOICE
-    ).aggregate(Sum('amount'))['amount__sum'] or 0
-    
-    # Payments + Waivers
-    total_paid = student.transactions.filter(
-        transaction_type__in=[Transaction.TransactionType.PAYMENT, Transaction.TransactionType.WAIVER]
-    ).aggregate(Sum('amount'))['amount__sum'] or 0
+    student = get_object_or_404(Student.objects.select_related('current_class', 'user'), id=student_id)
     
-    # Recent Transactions
-    recent_transactions = student.transactions.all().order_by('-date')[:5]
+    # Totals (invoiced, paid + waived) and the recent transactions in one query
+    ledger = student_ledger(student.id, limit=5)
     
     context = {
         'student': student,
-        'total_invoiced': total_invoiced,
-        'total_paid': total_paid,
-        'recent_transactions': recent_transactions,
+        'total_invoiced': ledger.total_invoiced,
+        'total_paid': ledger.total_paid,
+        'recent_transactions': ledger.transactions,
+        'ledger': ledger,
     }
     return render(request, 'students/student_detail.html', context)
 
+@login_required
+@user_passes_test(is_admin)
+def student_transactions(request, student_id):
+    """
+    A student's full transaction history with running balances (keyset paginated).
+    """
+    student = get_object_or_404(Student.objects.select_related('current_class'), id=student_id)
+    context = transaction_history_context(request, student, reverse('student_transactions', args=[student.id]))
+    context.update(back_url=reverse('student_detail', args=[student.id]), show_receipts=True)
+    return render(request, 'students/transaction_history.html', context)
+
 @login_required
 @user_passes_test(is_admin)
 def student_delete(request, student_id):
@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import statistics
+import subprocess
+from collections import defaultdict
+
+# Cold start of a web worker: a fresh interpreter importing config.wsgi (settings,
+# apps, models, admin) and then the URLconf (every view module), as the first
+# request does. Each run is a new process, so nothing is cached in sys.modules.
+# Override the number of runs with: python bench_import_time.py <runs>
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules a worker should only load when it renders a PDF
+PDF_STACK = ['xhtml2pdf', 'reportlab', 'html5lib', 'pypdf', 'svglib', 'apps.finance.pdf.direct', 'apps.finance.pdf.xhtml']
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import config.wsgi
+wsgi = time.perf_counter() - start
+import config.urls
+urls = time.perf_counter() - start
+startup = sorted(sys.modules)
+from apps.finance.pdf import get_pdf_backend
+before = time.perf_counter()
+get_pdf_backend().warm_up()
+pdf = time.perf_counter() - before
+print(json.dumps({'wsgi': wsgi, 'urls': urls, 'pdf': pdf, 'modules': startup}))
+"""
+
+def cold_start(importtime=False):
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'config.settings'}
+    command = [sys.executable, *(['-X', 'importtime'] if importtime else []), '-c', CHILD]
+    result = subprocess.run(command, capture_output=True, text=True, env=env, cwd=BASE_DIR, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+def slowest_packages(importtime_log, limit=8):
+    """Cumulative import time of top-level imports, per root package."""
+    totals = defaultdict(int)
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Top-level imports are not indented
+        if name.startswith('  ') or not name.strip():
+            continue
+        totals[name.strip().split('.')[0]] += int(cumulative)
+    return sorted(totals.items(), key=lambda item: -item[1])[:limit]
+
+def run_benchmark():
+    print(f"=== Cold start: import config.wsgi + config.urls ({RUNS} runs) ===")
+    runs = [cold_start()[0] for _ in range(RUNS)]
+    for key, label in [('wsgi', 'config.wsgi'), ('urls', '+ config.urls'), ('pdf', 'PDF engine, first use')]:
+        times = [run[key] * 1000 for run in runs]
+        print(f"    {label:<22} median {statistics.median(times):7.1f}ms  min {min(times):7.1f}ms")
+
+    print("\n=== Slowest top-level imports, PDF warm-up included (one run, -X importtime) ===")
+    _, log = cold_start(importtime=True)
+    for package, microseconds in slowest_packages(log):
+        print(f"    {package:<22} {microseconds / 1000:7.1f}ms")
+
+    loaded = sorted({
+        name for name in runs[0]['modules'] for root in PDF_STACK if name == root or name.startswith(root + '.')
+    })
+    print()
+    if loaded:
+        print(f"    [FAIL] PDF modules loaded at startup: {', '.join(loaded[:10])}")
+    else:
+        print("    [PASS] No PDF engine modules loaded at startup")
+
+if __name__ == '__main__':
+    run_benchmark()
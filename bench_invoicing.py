@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import django
+from decimal import Decimal
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_test_environment, CaptureQueriesContext
+from apps.core.models import StudentClass, Term, AcademicSession
+from apps.students.models import Student
+from apps.finance.models import FeeStructure, Transaction
+from apps.finance.services import invoice_fee_structures
+
+# Benchmark size (override with: python bench_invoicing.py <students> <fees>)
+NUM_STUDENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+NUM_FEES = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+NUM_CLASSES = 20
+
+def seed_data():
+    print(f"Seeding {NUM_STUDENTS} students in {NUM_CLASSES} classes, {NUM_FEES} fees per class...")
+    session = AcademicSession.objects.create(name="Bench 2026", is_current=True)
+    term = Term.objects.create(session=session, name="Term 1", is_current=True)
+    classes = StudentClass.objects.bulk_create([
+        StudentClass(name=f"Bench Class {i}") for i in range(NUM_CLASSES)
+    ])
+    Student.objects.bulk_create([
+        Student(
+            admission_number=f"BEN{i:06d}",
+            first_name="Bench",
+            last_name=f"Student{i}",
+            current_class=classes[i % NUM_CLASSES],
+            parent_phone="0700000000",
+        )
+        for i in range(NUM_STUDENTS)
+    ], batch_size=500)
+    fees = FeeStructure.objects.bulk_create([
+        FeeStructure(term=term, student_class=cls, amount=Decimal("1000.00") + j, description=f"Fee {j}")
+        for cls in classes for j in range(NUM_FEES)
+    ])
+    return FeeStructure.objects.select_related('term').filter(id__in=[f.id for f in fees])
+
+def run_benchmark():
+    fees = seed_data()
+
+    print("\n=== Bulk Invoicing (first run) ===")
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        created = invoice_fee_structures(fees)
+        elapsed = time.perf_counter() - start
+    print(f"    Invoices created: {created}")
+    print(f"    Time: {elapsed:.2f}s, Queries: {len(ctx.captured_queries)}")
+
+    expected = NUM_STUDENTS * NUM_FEES
+    if created == expected and Transaction.objects.count() == expected:
+        print("    [PASS] Every student invoiced for every fee")
+    else:
+        print(f"    [FAIL] Expected {expected} invoices")
+
+    student = Student.objects.filter(current_class=fees[0].student_class).first()
+    expected_balance = sum(f.amount for f in fees if f.student_class_id == student.current_class_id)
+    if student.current_balance == expected_balance:
+        print(f"    [PASS] Balance updated once per student: {student.current_balance}")
+    else:
+        print(f"    [FAIL] Balance mismatch. Expected {expected_balance}, got {student.current_balance}")
+
+    print("\n=== Bulk Invoicing (re-run, nothing to do) ===")
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        created = invoice_fee_structures(fees)
+        elapsed = time.perf_counter() - start
+    print(f"    Time: {elapsed:.2f}s, Queries: {len(ctx.captured_queries)}")
+    if created == 0:
+        print("    [PASS] No duplicate invoices")
+    else:
+        print(f"    [FAIL] Created {created} duplicate invoices")
+
+if __name__ == '__main__':
+    # Run against a throwaway database so db.sqlite3 is never touched
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        run_benchmark()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,121 @@
+import os
+import sys
+import logging
+import time
+import datetime
+import django
+from decimal import Decimal
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+from apps.core.models import StudentClass
+from apps.students.models import Student
+from apps.finance.models import Transaction
+from apps.finance.ledger import balance_after
+from apps.finance.pdf import get_pdf_backend
+
+# Benchmark size (override with: python bench_pdf_backends.py <receipts>)
+NUM_RECEIPTS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+BACKENDS = [
+    'apps.finance.pdf.xhtml.PDFBackend',
+    'apps.finance.pdf.direct.PDFBackend',
+]
+
+# Names the old ISO-8859-1 encoding could not print, and Helvetica cannot draw
+NAMES = [
+    ("Wanjiru", "Kamau"), ("Zoë", "Müller"), ("Łukasz", "Żółkiewski"),
+    ("Дмитрий", "Иванов"), ("Αλέξανδρος", "Παπαδόπουλος"), ("Nguyễn", "Thị Hương"),
+]
+
+def seed_data():
+    print(f"Seeding {NUM_RECEIPTS} payments...")
+    school_class = StudentClass.objects.create(name="Bench Class")
+    students = Student.objects.bulk_create([
+        Student(
+            admission_number=f"BEN{i:06d}",
+            first_name=NAMES[i % len(NAMES)][0],
+            last_name=NAMES[i % len(NAMES)][1],
+            current_class=school_class,
+            parent_phone="0700000000",
+        )
+        for i in range(NUM_RECEIPTS)
+    ], batch_size=500)
+    start = timezone.now() - datetime.timedelta(days=30)
+    transactions = []
+    for i, student in enumerate(students):
+        for offset, kind, amount, reference in [
+            (0, Transaction.TransactionType.INVOICE, Decimal("25000.00"), f"INV-B{i:06d}"),
+            (1, Transaction.TransactionType.PAYMENT, Decimal("12500.50") + i, f"RCP-B{i:06d}"),
+        ]:
+            date = start + datetime.timedelta(days=offset, minutes=i)
+            transactions.append(Transaction(
+                student=student, transaction_type=kind, amount=amount, date=date,
+                posted_on=Transaction.local_posting_date(date), description="M-Pesa" if offset else "Term Fees",
+                student_class=school_class,
+                reference_number=reference,
+            ))
+    Transaction.objects.bulk_create(transactions, batch_size=500)
+
+    payments = list(
+        Transaction.objects.filter(transaction_type=Transaction.TransactionType.PAYMENT)
+        .select_related('student', 'student_class').order_by('id')
+    )
+    # Balances are looked up once up front: only the rendering is timed
+    return [(payment, balance_after(payment)) for payment in payments]
+
+def run_benchmark():
+    # xhtml2pdf logs every CSS property it ignores
+    logging.getLogger('xhtml2pdf').setLevel(logging.ERROR)
+    receipts = seed_data()
+    results = {}
+
+    for path in BACKENDS:
+        print(f"\n=== {path} ===")
+        start = time.perf_counter()
+        backend = get_pdf_backend(path)
+        print(f"    Setup: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        failed = 0
+        size = 0
+        start = time.perf_counter()
+        for payment, balance in receipts:
+            content = backend.render_receipt(payment, balance)
+            if content is None or not content.startswith(b'%PDF'):
+                failed += 1
+            else:
+                size += len(content)
+        elapsed = time.perf_counter() - start
+        results[path] = elapsed
+
+        print(f"    Time: {elapsed:.2f}s ({elapsed / len(receipts) * 1000:.1f}ms per receipt), "
+              f"{size / max(len(receipts) - failed, 1) / 1024:.1f}KB per receipt")
+        if failed:
+            print(f"    [FAIL] {failed} receipts could not be rendered")
+        else:
+            print(f"    [PASS] {len(receipts)} receipts rendered")
+
+    # Names Helvetica cannot encode are set in an embedded font, the rest are not
+    direct = get_pdf_backend(BACKENDS[1])
+    latin, cyrillic = receipts[0], receipts[3 % len(receipts)]
+    if b'/FontFile2' in direct.render_receipt(*cyrillic) and b'/FontFile2' not in direct.render_receipt(*latin):
+        print("\n    [PASS] Direct receipts embed a TrueType font only for non-Latin names")
+    else:
+        print("\n    [FAIL] Direct receipts embed fonts when not needed, or not when needed")
+
+    baseline, direct = results[BACKENDS[0]], results[BACKENDS[1]]
+    print(f"\n=== Summary ===\n    Direct drawing is {baseline / direct:.1f}x faster than xhtml2pdf")
+
+if __name__ == '__main__':
+    # Run against a throwaway database so db.sqlite3 is never touched
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        run_benchmark()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import random
+import django
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import setup_test_environment
+from apps.core.models import StudentClass
+from apps.students.models import Student
+from apps.students.search import search_students
+
+# Benchmark size (override with: python bench_student_search.py <students>)
+NUM_STUDENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+FIRST_NAMES = ["John", "Mary", "Peter", "Grace", "James", "Faith", "David", "Mercy", "Brian", "Joy"]
+LAST_NAMES = ["Kamau", "Wanjiku", "Otieno", "Achieng", "Mwangi", "Njeri", "Kiprop", "Chebet", "Mutua", "Wambui"]
+QUERIES = ["john", "jo ka", "wanj", "ADM/2024/0123", "0712", "Grace Otieno", "mwangi", "zzz"]
+
+def seed_data():
+    print(f"Seeding {NUM_STUDENTS} students...")
+    rng = random.Random(42)
+    classes = StudentClass.objects.bulk_create([StudentClass(name=f"Search Class {i}") for i in range(20)])
+    Student.objects.bulk_create([
+        Student(
+            admission_number=f"ADM/2024/{i:05d}",
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=f"{rng.choice(LAST_NAMES)}{'' if i % 3 else i}",
+            current_class=classes[i % 20],
+            parent_phone=f"07{rng.randint(10000000, 99999999)}",
+        )
+        for i in range(NUM_STUDENTS)
+    ], batch_size=1000)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+def first_page(students):
+    """What student_list does: a COUNT for the paginator plus the first page."""
+    page = Paginator(students, 20).get_page(1)
+    return page.paginator.count, list(page)
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def run_benchmark():
+    seed_data()
+    base = Student.objects.select_related('current_class').order_by('current_class', 'first_name')
+
+    print(f"\n{'query':<16}{'icontains':>12}{'full-text':>12}{'matches':>10}")
+    slowest = 0
+    for query in QUERIES:
+        like, _ = timed(lambda: first_page(base.filter(
+            Q(first_name__icontains=query) | Q(last_name__icontains=query) | Q(admission_number__icontains=query)
+        )))
+        fts, (count, _) = timed(lambda: first_page(search_students(base, query)))
+        slowest = max(slowest, fts)
+        print(f"{query:<16}{like * 1000:>10.1f}ms{fts * 1000:>10.1f}ms{count:>10}")
+
+    print(f"\nSlowest full-text search: {slowest * 1000:.1f}ms")
+    return slowest
+
+if __name__ == '__main__':
+    # Run against a throwaway database so db.sqlite3 is never touched
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        run_benchmark()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -62,6 +62,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.audit.middleware.AuditBufferMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -131,6 +132,31 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Notification backends
+# SMS: 'apps.notifications.backends.console.SMSBackend' (default), '.filebased.SMSBackend',
+#      '.http.SMSBackend' (POSTs batches to SMS_HTTP_URL, see 'manage.py run_sms_stub') or '.locmem.SMSBackend'
+# Email: any Django email backend, e.g. 'django.core.mail.backends.smtp.EmailBackend'
+SMS_BACKEND = os.environ.get('SMS_BACKEND', 'apps.notifications.backends.console.SMSBackend')
+SMS_FILE_PATH = os.environ.get('SMS_FILE_PATH', BASE_DIR / 'sent_sms')
+SMS_HTTP_URL = os.environ.get('SMS_HTTP_URL', 'http://127.0.0.1:8025/sms')
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH', BASE_DIR / 'sent_emails')
+
+# Audit log writes: 'sync' (immediate, use in tests), 'request' (one bulk insert per
+# request) or 'queue' (process-wide write-behind queue, flushed every
+# AUDIT_FLUSH_INTERVAL seconds, at AUDIT_BATCH_SIZE entries and on shutdown)
+AUDIT_LOG_MODE = os.environ.get('AUDIT_LOG_MODE', 'request')
+AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', 2))
+AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', 100))
+
+# Audit entries older than this many days (rounded back to a month boundary) are moved
+# to monthly gzip files by 'manage.py archive_audit_logs'
+AUDIT_RETENTION_DAYS = int(os.environ.get('AUDIT_RETENTION_DAYS', 365))
+AUDIT_ARCHIVE_DIR = os.environ.get('AUDIT_ARCHIVE_DIR', BASE_DIR / 'audit_archive')
+
+# School details used in receipts and notifications
+SCHOOL_NAME = os.environ.get('SCHOOL_NAME', 'Jets High School')
+
 # Login Redirects
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'home'
@@ -145,6 +171,50 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Caching
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# The default local-memory cache is per process. When running several workers,
+# point this at a shared backend (e.g. Redis or the database cache) so that
+# invalidation reaches every worker.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Home dashboard stats: cache lifetime, and how stale (in seconds) the figures may
+# get after a write before they are recomputed. Raise the staleness bound during
+# busy periods (e.g. term opening) to avoid recomputing after every payment.
+HOME_STATS_CACHE_TIMEOUT = int(os.environ.get('HOME_STATS_CACHE_TIMEOUT', 300))
+HOME_STATS_MAX_STALENESS = int(os.environ.get('HOME_STATS_MAX_STALENESS', 0))
+
+# Payment desk type-ahead: how long (in seconds) the matches for a search prefix are
+# cached. Balances are always read fresh; adding or editing a student clears the cache.
+STUDENT_LOOKUP_CACHE_TIMEOUT = int(os.environ.get('STUDENT_LOOKUP_CACHE_TIMEOUT', 60))
+
+# Receipt PDFs are rendered once per transaction (and receipt template version) and
+# kept on disk; the least recently used files are removed past this size.
+RECEIPT_CACHE_DIR = os.environ.get('RECEIPT_CACHE_DIR', str(MEDIA_ROOT / 'receipts'))
+RECEIPT_CACHE_MAX_BYTES = int(os.environ.get('RECEIPT_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+
+# PDF rendering: 'apps.finance.pdf.direct.PDFBackend' (default) draws receipts straight
+# onto a ReportLab canvas; 'apps.finance.pdf.xhtml.PDFBackend' renders them from the
+# HTML template through xhtml2pdf. Statements always use their templates.
+# Text outside Latin-1 (e.g. Cyrillic or Greek names) needs a TrueType font covering
+# it, embedded by both backends: PDF_FONT_PATH / PDF_BOLD_FONT_PATH, by default DejaVu
+# Sans if installed. Without one a warning is logged and such names print as boxes.
+PDF_BACKEND = os.environ.get('PDF_BACKEND', 'apps.finance.pdf.direct.PDFBackend')
+PDF_FONT_PATH = os.environ.get('PDF_FONT_PATH', '')
+PDF_BOLD_FONT_PATH = os.environ.get('PDF_BOLD_FONT_PATH', '')
+# The PDF engine is loaded on first use. Set this to load it (and the fonts) as each
+# bulk export worker process starts instead, so their first documents are not slower.
+PDF_WORKER_PREWARM = os.environ.get('PDF_WORKER_PREWARM') == 'True'
+# Worker processes per ZIP download of receipts or statements from the web. Every
+# concurrent download forks its own pool, so keep this small; 0 renders in the
+# request's process, without forking or closing its DB connections. The
+# export_receipts / export_statements commands default to one process per CPU.
+PDF_EXPORT_WORKERS = int(os.environ.get('PDF_EXPORT_WORKERS', 0))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/6.0/ref/settings/#default-auto-field
 
@@ -42,10 +42,12 @@ def verify_pdf_generation():
         response = download_receipt(request, transaction.id)
         
         if response.status_code == 200 and response['Content-Type'] == 'application/pdf':
-            print(f"[PASS] PDF Generated successfully. Size: {len(response.content)} bytes")
+            # Receipts are served from the on-disk cache as a FileResponse
+            content = b''.join(response.streaming_content)
+            print(f"[PASS] PDF Generated successfully. Size: {len(content)} bytes")
             
             # Simple check for PDF header
-            if response.content.startswith(b'%PDF'):
+            if content.startswith(b'%PDF'):
                  print("[PASS] Valid PDF Header detected.")
             else:
                  print("[FAIL] Invalid PDF content.")
@@ -0,0 +1,162 @@
+import os
+import re
+import sys
+import django
+import datetime
+from decimal import Decimal
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.db import connection
+from django.db.models import Q, Sum
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+from apps.core.models import StudentClass, Term, AcademicSession
+from apps.students.models import Student
+from apps.finance.models import FeeStructure, Transaction
+from apps.finance.services import invoice_fee_structures
+from apps.finance.ledger import student_ledger
+from apps.audit.models import AuditLog
+from apps.users.models import User
+
+# Tables whose hot queries must never fall back to a full table scan
+GUARDED_TABLES = [Transaction._meta.db_table, AuditLog._meta.db_table]
+
+NUM_STUDENTS = 500
+NUM_PAYMENTS = 3000
+NUM_AUDIT_LOGS = 5000
+
+def seed_data():
+    print(f"Seeding {NUM_STUDENTS} students and their ledgers...")
+    session = AcademicSession.objects.create(name="Plan 2026", is_current=True)
+    term = Term.objects.create(session=session, name="Term 1", is_current=True)
+    classes = StudentClass.objects.bulk_create([StudentClass(name=f"Plan Class {i}") for i in range(5)])
+    Student.objects.bulk_create([
+        Student(admission_number=f"PLN{i:05d}", first_name="Plan", last_name=f"Student{i}",
+                current_class=classes[i % 5], parent_phone="0700000000")
+        for i in range(NUM_STUDENTS)
+    ])
+    fees = FeeStructure.objects.bulk_create([
+        FeeStructure(term=term, student_class=cls, amount=Decimal("5000.00"), description=f"Fee {j}")
+        for cls in classes for j in range(3)
+    ])
+    invoice_fee_structures(FeeStructure.objects.select_related('term').filter(id__in=[f.id for f in fees]))
+
+    student_ids = list(Student.objects.values_list('id', flat=True))
+    now = timezone.now()
+    Transaction.objects.bulk_create([
+        Transaction(student_id=student_ids[i % len(student_ids)], transaction_type=Transaction.TransactionType.PAYMENT,
+                    amount=Decimal("100.00"), description="Plan Payment", reference_number=f"PLAN-PAY-{i}",
+                    date=now - datetime.timedelta(hours=i),
+                    posted_on=Transaction.local_posting_date(now - datetime.timedelta(hours=i)))
+        for i in range(NUM_PAYMENTS)
+    ], batch_size=500)
+
+    actor = User.objects.create_user(username="plan_admin", password="x", role=User.Role.ADMIN)
+    AuditLog.objects.bulk_create([
+        AuditLog(actor=actor if i % 2 else None, action=AuditLog.Action.PAYMENT if i % 3 else AuditLog.Action.UPDATE,
+                 target_model="Student", target_object_id=str(student_ids[i % len(student_ids)]),
+                 target_repr="Plan Student")
+        for i in range(NUM_AUDIT_LOGS)
+    ], batch_size=500)
+
+    # Give the query planner real statistics, as a long-running database would have
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    return Student.objects.get(admission_number="PLN00001"), fees[0]
+
+def hot_queries(student, fee):
+    """
+    The Transaction queries issued by the dashboards, reports and ledger views.
+    Each entry is (name, callable that runs the query).
+    """
+    today = timezone.localdate()
+    week_ago = timezone.now() - datetime.timedelta(days=7)
+    newest = AuditLog.objects.order_by('-timestamp', '-id').first()
+    keyset = (Q(timestamp__lt=newest.timestamp) | Q(id__lt=newest.id)) & Q(timestamp__lte=newest.timestamp)
+    PAYMENT = Transaction.TransactionType.PAYMENT
+    INVOICE = Transaction.TransactionType.INVOICE
+    return [
+        ("home: total collected", lambda: Transaction.objects.filter(
+            transaction_type=PAYMENT).aggregate(Sum('amount'))),
+        ("home: expected revenue", lambda: Transaction.objects.filter(
+            transaction_type=INVOICE).aggregate(Sum('amount'))),
+        ("reports/bursar: today's payments", lambda: Transaction.objects.filter(
+            transaction_type=PAYMENT, posted_on=today).aggregate(Sum('amount'))),
+        ("bursar: recent payments", lambda: list(Transaction.objects.filter(
+            transaction_type=PAYMENT).select_related('student').order_by('-date')[:10])),
+        ("daily_collection: listing", lambda: list(Transaction.objects.filter(
+            transaction_type=PAYMENT, posted_on__range=(today, today)).select_related('student', 'student__current_class').order_by('-date'))),
+        ("daily_collection: date range", lambda: Transaction.objects.filter(
+            transaction_type=PAYMENT, posted_on__range=(today - datetime.timedelta(days=30), today)).aggregate(Sum('amount'))),
+        ("student_detail/portal: ledger", lambda: student_ledger(student.id, limit=5)),
+        ("student history: older page", lambda: student_ledger(
+            student.id, cursor=student_ledger(student.id, limit=5).next_cursor)),
+        ("portal: mark invoices viewed", lambda: Transaction.mark_invoices_viewed(student.id)),
+        ("invoicing: already billed pairs", lambda: list(Transaction.objects.filter(
+            fee_structure__in=[fee]).values_list('student_id', 'fee_structure_id'))),
+        ("audit: next page", lambda: list(AuditLog.objects.filter(keyset).order_by('-timestamp', '-id')[:51])),
+        ("audit: by action", lambda: list(AuditLog.objects.filter(keyset, action=AuditLog.Action.UPDATE).order_by('-timestamp', '-id')[:51])),
+        ("audit: by actor", lambda: list(AuditLog.objects.filter(keyset, actor_id=newest.actor_id or 0).order_by('-timestamp', '-id')[:51])),
+        ("audit: by target", lambda: list(AuditLog.objects.filter(
+            keyset, target_model="Student", target_object_id=str(student.id)).order_by('-timestamp', '-id')[:51])),
+        ("audit: date range", lambda: list(AuditLog.objects.filter(
+            keyset, timestamp__gte=week_ago).order_by('-timestamp', '-id')[:51])),
+    ]
+
+def capture_sql(func):
+    """Runs func and returns every (sql, params) it sent to the database."""
+    statements = []
+
+    def wrapper(execute, sql, params, many, context):
+        statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        func()
+    return statements
+
+def full_scans(sql, params):
+    """Returns the EXPLAIN QUERY PLAN lines that scan a guarded table without an index."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        plan = [row[-1] for row in cursor.fetchall()]
+    bad = []
+    for line in plan:
+        match = re.match(r'SCAN (\w+)', line)
+        if match and match.group(1) in GUARDED_TABLES and 'INDEX' not in line:
+            bad.append(line)
+    return plan, bad
+
+def verify_query_plans():
+    student, fee = seed_data()
+    print("\n=== Checking Query Plans ===")
+    failures = 0
+    for name, func in hot_queries(student, fee):
+        for sql, params in capture_sql(func):
+            plan, bad = full_scans(sql, params)
+            if bad:
+                failures += 1
+                print(f"[FAIL] {name}")
+                for line in plan:
+                    print(f"         {line}")
+            else:
+                print(f"[PASS] {name}: {' | '.join(plan)}")
+    return failures
+
+if __name__ == '__main__':
+    # Run against a throwaway database so db.sqlite3 is never touched
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        failures = verify_query_plans()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    if failures:
+        print(f"\n{failures} hot query(ies) fell back to a full table scan.")
+        sys.exit(1)
+    print("\nAll hot queries use an index.")